@@ -4,7 +4,10 @@ Chord Detection Module for MIDI Monitor
 Detects chords from active MIDI notes using music theory patterns
 """
 
-from typing import Set, Optional, List, Tuple
+import os
+import re
+import sys
+from typing import NamedTuple, Set, Optional, Tuple
 from collections import Counter
 
 # MIDI note names (pitch classes)
@@ -433,13 +436,152 @@ INVERSION_NAMES = {
     3: '/7th',       # Third inversion (7th in bass)
 }
 
+
+def pcmask(notes) -> int:
+    """12-bit pitch-class mask of MIDI notes (bit i set iff pitch class i is present)"""
+    mask = 0
+    for note in notes:
+        mask |= 1 << (note % 12)
+    return mask
+
+
+def _note_bounds(notes) -> Tuple[int, int, int]:
+    """Lowest note, highest note and pitch-class mask of a non-empty note set, in one pass"""
+    it = iter(notes)
+    lowest = highest = next(it)
+    mask = 1 << (lowest % 12)
+    for note in it:
+        if note < lowest:
+            lowest = note
+        elif note > highest:
+            highest = note
+        mask |= 1 << (note % 12)
+    return lowest, highest, mask
+
+
+def transpose_mask(mask: int, semitones: int) -> int:
+    """Rotate a pitch-class mask up by semitones (negative rotates down)"""
+    k = semitones % 12
+    return ((mask << k) | (mask >> (12 - k))) & 0xFFF
+
+
+# Sorted interval tuple for every 12-bit mask
+_MASK_INTERVALS = tuple(tuple(i for i in range(12) if mask >> i & 1) for mask in range(4096))
+
+
+# Number of set bits for every 12-bit mask (int.bit_count() needs Python 3.10+)
+_MASK_POPCOUNT = tuple(bin(mask).count('1') for mask in range(4096))
+
+
+def intervals_from(mask: int, root_pc: int) -> Tuple[int, ...]:
+    """Sorted intervals above root_pc of the pitch classes in a mask"""
+    return _MASK_INTERVALS[transpose_mask(mask, -root_pc)]
+
+
+# Interval bits for mask checks relative to a root
+_THIRD_BITS = (1 << 3) | (1 << 4)        # m3 or M3
+_SEVENTH_BITS = (1 << 10) | (1 << 11)    # m7 or M7
+_DOMINANT_BITS = (1 << 4) | (1 << 10)    # M3 and m7
+
+# Root note at the start of a chord name: two-character names (Bb, C#, ...) first,
+# then a bare letter - same precedence as NOTE_NAMES_FLAT/NOTE_NAMES lookups
+_CHORD_ROOT_RE = re.compile(r'[DEGAB]b|[CDFGA]#|[A-G]')
+
+# Chord name quality suffix -> chord type
+_QUALITY_TO_TYPE = {
+    '': 'major',
+    'm': 'minor',
+    'dim': 'diminished',
+    'aug': 'augmented',
+    '2': 'sus2',
+    '4': 'sus4',
+    '7sus4': '7sus4',
+    '7sus2': '7sus2',
+    '7sus13': '7sus13',
+    'sus13': 'sus13',
+    'Δ7': 'major7',
+    'Δ7#5': 'major7#5',
+    'm7': 'minor7',
+    'mΔ7': 'minor_major7',
+    'mΔ7(9)': 'minor_major9',
+    '7': 'dominant7',
+    'dim7': 'diminished7',
+    'dimΔ7': 'diminished_major7',
+    'ø7': 'half_diminished7',
+    '9': 'dominant9',
+    '11': 'dominant11',
+    '13': 'dominant13',
+    'Δ9': 'major9',
+    'm9': 'minor9',
+    'Δ11': 'major11',
+    'Δ7#11': 'major7#11',
+    'm11': 'minor11',
+    'Δ13': 'major13',
+    'Δ13#11': 'major13#11',
+    'm13': 'minor13',
+    '7alt': 'altered',
+    '5': '5',
+    '6': '6',
+    '6/9': '6_9',
+    'm6': 'minor6',
+    'm6/9': 'minor6_9',
+    'add9': 'add9',
+    'add11': 'add11',
+}
+
+# A bare "13" could be any 13 variant
+_THIRTEEN_TYPES = frozenset({'dominant13', '13_shell', '13_no5_no11', '13_no5'})
+
+# Altered dominants with specific tensions (#11, #9) that require ALL essential intervals
+_STRICT_ESSENTIAL_TYPES = frozenset({'7b9#11', '7#9#11', '7#9#11_shell', '7b9#11_shell', '7b9#11_no3'})
+
+# Chord templates with their interval sets built once at import instead of per
+# candidate root: (chord_type, pattern, pattern_set, essential, optional,
+# pattern_mask, essential_mask, strict). The masks let _match_chord_pattern reject
+# templates with a couple of ANDs before doing any set arithmetic.
+_CHORD_TEMPLATES = tuple(
+    (chord_type, pattern, frozenset(pattern),
+     frozenset(ESSENTIAL_INTERVALS.get(chord_type, ())),
+     frozenset(OPTIONAL_INTERVALS.get(chord_type, ())),
+     pcmask(pattern), pcmask(ESSENTIAL_INTERVALS.get(chord_type, ())),
+     chord_type in _STRICT_ESSENTIAL_TYPES)
+    for chord_type, pattern in CHORD_PATTERNS.items()
+)
+
+# Scale templates as prebuilt interval sets: (scale_name, pattern_set)
+_SCALE_TEMPLATES = tuple((scale_name, frozenset(pattern)) for scale_name, pattern in SCALE_PATTERNS.items())
+
+# Scales that should only be detected when clustered OR within one octave
+_CLUSTERED_ONLY_SCALES = frozenset({
+    'Major Pentatonic', 'Minor Pentatonic',
+    'Major Blues', 'Minor Blues',
+    'Whole Tone'
+})
+
+# Modes of the major, melodic minor and harmonic minor scales (bonus on a perfect match)
+_MODE_SCALES = frozenset({
+    # Major modes (Ionian through Locrian)
+    'Ionian', 'Dorian', 'Phrygian', 'Lydian', 'Mixolydian', 'Aeolian', 'Locrian',
+    # Melodic minor modes
+    'Melodic Minor', 'Dorian b2', 'Lydian Augmented', 'Lydian Dominant',
+    'Mixolydian b6', 'Locrian #2', 'Altered',
+    # Harmonic minor modes
+    'Harmonic Minor', 'Locrian #6', 'Ionian #5', 'Dorian #4',
+    'Phrygian Dominant', 'Lydian #2', 'Altered Diminished',
+})
+
+
 class ChordDetector:
     """Detect chords from active MIDI notes"""
 
+    # Upper bound on memoized detect_chord results (cleared when exceeded)
+    DETECT_CACHE_SIZE = 4096
+
     def __init__(self, prefer_flats=True):
         self.min_notes_for_chord = 2  # Minimum notes to detect a chord
         self.max_notes_for_chord = 7   # Maximum notes to consider
         self.prefer_flats = prefer_flats  # Preference for flat vs sharp note names
+        self._detect_cache = {}
 
     def set_note_preference(self, prefer_flats):
         """Set preference for flat or sharp note names"""
@@ -545,6 +687,63 @@ class ChordDetector:
         if len(active_notes) < self.min_notes_for_chord:
             return None
 
+        # Results depend only on the voicing shape and the bass pitch class (octave
+        # shifts give the same name), so key on (bass pc, note offsets above the bass
+        # as a bitmask). Above max_notes_for_chord the pitch-class reduction is not
+        # octave invariant, so key on the exact notes instead.
+        lowest = min(active_notes)
+        if len(active_notes) <= self.max_notes_for_chord:
+            voicing = 0
+            for note in active_notes:
+                voicing |= 1 << (note - lowest)
+            key = (self.prefer_flats, lowest % 12, voicing)
+        else:
+            key = (self.prefer_flats, frozenset(active_notes))
+
+        cache = self._detect_cache
+        if key in cache:
+            return cache[key]
+        result = self._detect_chord_uncached(active_notes, lowest_note)
+        if result is not None:
+            # Interned names let callers compare repeated results by identity
+            result = sys.intern(result)
+        if len(cache) >= self.DETECT_CACHE_SIZE:
+            cache.clear()
+        cache[key] = result
+        return result
+
+    def detect_chord_mask(self, note_mask: int) -> Optional[str]:
+        """
+        Detect chord from a bitmask of active MIDI notes (bit n set = note n held)
+
+        Cache hits are resolved from the mask alone (popcount, lowest bit and a
+        shift), without building a set of notes.
+
+        Args:
+            note_mask: Integer with bit n set for each active MIDI note n
+
+        Returns:
+            Chord name string or None
+        """
+        count = bin(note_mask).count('1')
+        if count < self.min_notes_for_chord:
+            return None
+
+        # Same key detect_chord builds: the shifted mask is the voicing bitmask
+        if count <= self.max_notes_for_chord:
+            lowest = (note_mask & -note_mask).bit_length() - 1
+            key = (self.prefer_flats, lowest % 12, note_mask >> lowest)
+            cache = self._detect_cache
+            if key in cache:
+                return cache[key]
+
+        return self.detect_chord({n for n in range(note_mask.bit_length()) if note_mask >> n & 1})
+
+    def _detect_chord_uncached(self, active_notes: Set[int], lowest_note: Optional[int] = None) -> Optional[str]:
+        """detect_chord without the result cache"""
+        if len(active_notes) < self.min_notes_for_chord:
+            return None
+
         # For exactly 2 notes, detect interval instead of chord
         if len(active_notes) == 2:
             return self.detect_interval(active_notes)
@@ -552,29 +751,29 @@ class ChordDetector:
         # Save original active_notes for scale detection (before it gets modified)
         original_active_notes = active_notes.copy()
 
-        # Convert to pitch classes
-        pitch_classes_all = sorted(set(note % 12 for note in active_notes))
+        # Bass, top note and pitch classes in a single pass over the notes
+        lowest_note, highest_note, pc_mask = _note_bounds(active_notes)
+        pc_count = _MASK_POPCOUNT[pc_mask]
 
         # Save for later: check for scales if:
         # 1. Notes are within one octave (span < 12) AND have 5+ unique pitches, OR
         # 2. Notes are clustered (5+ notes)
         # But try chord detection first
         should_check_scale_later = False
-        chord_span_early = max(active_notes) - min(active_notes)
-        if len(pitch_classes_all) >= 5:
+        chord_span_early = highest_note - lowest_note
+        if pc_count >= 5:
             if (chord_span_early < 12) or self.is_clustered(active_notes):
                 should_check_scale_later = True
 
         # If we have 7 unique pitch classes (and not clustered), check if it's a 13th chord
-        if len(pitch_classes_all) == 7:
-            lowest_note = min(active_notes)
+        if pc_count == 7:
             lowest_pc = lowest_note % 12
 
             # Check if the lowest note forms a chord with 3rd and 7th
             # (13th chords have 3rd + 7th + extensions)
-            intervals_from_lowest = set((pc - lowest_pc) % 12 for pc in pitch_classes_all)
-            has_third = (3 in intervals_from_lowest or 4 in intervals_from_lowest)
-            has_seventh = (10 in intervals_from_lowest or 11 in intervals_from_lowest)
+            intervals_from_lowest = transpose_mask(pc_mask, -lowest_pc)
+            has_third = bool(intervals_from_lowest & _THIRD_BITS)
+            has_seventh = bool(intervals_from_lowest & _SEVENTH_BITS)
 
             # If lowest note doesn't form a chord, try scale detection as fallback
             if not (has_third and has_seventh):
@@ -594,9 +793,10 @@ class ChordDetector:
             # Take top 7 most common
             most_common = [pc for pc, _ in pc_counter.most_common(7)]
             active_notes = {note for note in active_notes if note % 12 in most_common}
+            lowest_note, highest_note, pc_mask = _note_bounds(active_notes)
         
         # Convert to pitch classes (ignore octave)
-        pitch_classes = sorted(set(note % 12 for note in active_notes))
+        pitch_classes = [pc for pc in range(12) if pc_mask >> pc & 1]
 
         if len(pitch_classes) < 2:
             return None
@@ -606,11 +806,10 @@ class ChordDetector:
         # This is almost certainly a m6 chord from the note at interval 10
         # Example: C Bb Db G = Bbm6/C
         if len(pitch_classes) == 4:
-            lowest_note_early = min(active_notes)
-            lowest_pc_early = lowest_note_early % 12
-            intervals_from_lowest_early = sorted((pc - lowest_pc_early) % 12 for pc in pitch_classes)
+            lowest_pc_early = lowest_note % 12
+            intervals_from_lowest_early = intervals_from(pc_mask, lowest_pc_early)
 
-            if intervals_from_lowest_early == [0, 1, 7, 10]:
+            if intervals_from_lowest_early == (0, 1, 7, 10):
                 # Root is at interval 10 (m7 above bass)
                 root_pc_early = (lowest_pc_early + 10) % 12
                 root_name_early = self.get_note_name(root_pc_early)
@@ -622,11 +821,10 @@ class ChordDetector:
         # This is almost certainly a m6 chord with added P4/11
         # Example: C Bb Db F G = Bbm6/C (Bb Db F G is Bbm6, C is bass)
         if len(pitch_classes) == 5:
-            lowest_note_early1b = min(active_notes)
-            lowest_pc_early1b = lowest_note_early1b % 12
-            intervals_from_lowest_early1b = sorted((pc - lowest_pc_early1b) % 12 for pc in pitch_classes)
+            lowest_pc_early1b = lowest_note % 12
+            intervals_from_lowest_early1b = intervals_from(pc_mask, lowest_pc_early1b)
 
-            if intervals_from_lowest_early1b == [0, 1, 5, 7, 10]:
+            if intervals_from_lowest_early1b == (0, 1, 5, 7, 10):
                 # Root is at interval 10 (m7 above bass)
                 root_pc_early1b = (lowest_pc_early1b + 10) % 12
                 root_name_early1b = self.get_note_name(root_pc_early1b)
@@ -639,8 +837,7 @@ class ChordDetector:
         # Example: C E G Bb Db - upper structure E G Bb Db contains M3, P5, m7, b9 of C = C7b9
         # Otherwise: C D F Ab Cb = Ddim7/C (D F Ab Cb is dim7, C is bass)
         if len(pitch_classes) == 5:
-            lowest_note_early2 = min(active_notes)
-            lowest_pc_early2 = lowest_note_early2 % 12
+            lowest_pc_early2 = lowest_note % 12
 
             # Try to find a dim7 chord in the remaining 4 notes
             remaining_pcs = [pc for pc in pitch_classes if pc != lowest_pc_early2]
@@ -675,13 +872,12 @@ class ChordDetector:
         #          Bb Db F G = Bbm6 (Bb in bass, prefer m6)
         #          C Bb Db G = Bbm6/C (C in bass, interpret as m6 with slash)
         if len(pitch_classes) == 4:
-            lowest_note_halfdim = min(active_notes)
-            lowest_pc_halfdim = lowest_note_halfdim % 12
+            lowest_pc_halfdim = lowest_note % 12
 
             # Try all pitch classes as potential half-dim7 roots
             for potential_halfdim_root in pitch_classes:
-                intervals_from_halfdim = sorted((pc - potential_halfdim_root) % 12 for pc in pitch_classes)
-                if intervals_from_halfdim == [0, 3, 6, 10]:
+                intervals_from_halfdim = intervals_from(pc_mask, potential_halfdim_root)
+                if intervals_from_halfdim == (0, 3, 6, 10):
                     # Found a half-dim7 pattern!
                     # If the m7b5 root is in the bass, use m7b5
                     if potential_halfdim_root == lowest_pc_halfdim:
@@ -703,9 +899,7 @@ class ChordDetector:
                             return f"{m6_root_name}m6/{bass_name}"
 
         # Get highest and lowest notes for matching and inversion detection
-        highest_note = max(active_notes)
         highest_pc = highest_note % 12
-        lowest_note = min(active_notes)
         lowest_pc = lowest_note % 12
 
         # GLOBAL dominant quality check: Check if ANY pitch class forms dominant quality
@@ -713,9 +907,7 @@ class ChordDetector:
         # This prevents m6 interpretations from overwhelming dominant 7th chords
         has_global_dominant_quality = False
         for potential_root in pitch_classes:
-            m3_above = (potential_root + 4) % 12
-            m7_above = (potential_root + 10) % 12
-            if m3_above in pitch_classes and m7_above in pitch_classes:
+            if transpose_mask(pc_mask, -potential_root) & _DOMINANT_BITS == _DOMINANT_BITS:
                 has_global_dominant_quality = True
                 break
 
@@ -731,7 +923,7 @@ class ChordDetector:
 
         for root_pc in pitch_classes:
             # Calculate intervals from this root
-            intervals = sorted((pc - root_pc) % 12 for pc in pitch_classes)
+            intervals = intervals_from(pc_mask, root_pc)
 
             # Match against chord patterns with ChordieApp-inspired scoring
             match_result = self._match_chord_pattern(intervals, root_pc, active_notes, highest_note, highest_pc, lowest_pc, has_global_dominant_quality)
@@ -773,7 +965,7 @@ class ChordDetector:
                         b7_of_root = (potential_root + 10) % 12
                         if b7_of_root in remaining_pcs:
                             # Force detection as 7(b9)
-                            intervals_from_root = sorted((pc - potential_root) % 12 for pc in pitch_classes)
+                            intervals_from_root = intervals_from(pc_mask, potential_root)
                             match_7b9 = self._match_chord_pattern(intervals_from_root, potential_root,
                                                                  active_notes, highest_note, highest_pc, lowest_pc, has_global_dominant_quality)
                             if match_7b9:
@@ -806,7 +998,7 @@ class ChordDetector:
                         best_root_pc = lowest_pc
                     elif is_dim7:
                         # For dim7, re-detect with lowest note as root
-                        intervals_from_lowest = sorted((pc - lowest_pc) % 12 for pc in pitch_classes)
+                        intervals_from_lowest = intervals_from(pc_mask, lowest_pc)
                         match_from_lowest = self._match_chord_pattern(intervals_from_lowest, lowest_pc,
                                                                       active_notes, highest_note, highest_pc, lowest_pc, has_global_dominant_quality)
                         if match_from_lowest:
@@ -823,7 +1015,7 @@ class ChordDetector:
                 self._match_chord_type(best_match, 'augmented7')):
                 if best_root_pc != lowest_pc:
                     # Re-detect with lowest note as root
-                    intervals_from_lowest = sorted((pc - lowest_pc) % 12 for pc in pitch_classes)
+                    intervals_from_lowest = intervals_from(pc_mask, lowest_pc)
                     match_from_lowest = self._match_chord_pattern(intervals_from_lowest, lowest_pc,
                                                                   active_notes, highest_note, highest_pc, lowest_pc, has_global_dominant_quality)
                     if match_from_lowest:
@@ -864,7 +1056,7 @@ class ChordDetector:
                 skip_slash = True
 
             if not skip_slash:
-                intervals_from_root = sorted((pc - best_root_pc) % 12 for pc in pitch_classes)
+                intervals_from_root = intervals_from(pc_mask, best_root_pc)
 
                 # Find the best matching pattern for current chord
                 best_pattern = None
@@ -882,11 +1074,10 @@ class ChordDetector:
 
                 # Special case: Don't simplify for specific voicing patterns (C Bb D F G → Bb6/9/C)
                 # When we have the exact pattern [0, 2, 5, 7, 10] from lowest and detecting 6/9 chord
-                pitch_classes_set_for_check = sorted(set(note % 12 for note in active_notes))
-                intervals_from_lowest_for_check = sorted((pc - lowest_pc) % 12 for pc in pitch_classes_set_for_check)
+                intervals_from_lowest_for_check = intervals_from(pc_mask, lowest_pc)
 
                 # For [0, 2, 5, 7, 10] or [0, 2, 7, 10] from C, check voicing to decide Bb6/C vs Gm7/C
-                if intervals_from_lowest_for_check in [[0, 2, 5, 7, 10], [0, 2, 7, 10]]:
+                if intervals_from_lowest_for_check in ((0, 2, 5, 7, 10), (0, 2, 7, 10)):
                     # Get the notes in order from lowest to highest
                     sorted_notes = sorted(active_notes)
                     # Get the second note (first note above bass)
@@ -1079,62 +1270,17 @@ class ChordDetector:
 
         # Get the root and quality
         # Check 2-char note names first (like Bb, Db), then 1-char (like C, D)
-        quality = None
-        if len(chord_name) >= 2 and chord_name[:2] in NOTE_NAMES_FLAT + NOTE_NAMES:
-            quality = chord_name[2:]
-        elif len(chord_name) >= 1 and chord_name[:1] in NOTE_NAMES + NOTE_NAMES_FLAT:
-            quality = chord_name[1:]
-        else:
+        root = _CHORD_ROOT_RE.match(chord_name)
+        if root is None:
             return False
-
-        # Map quality to chord type
-        quality_map = {
-            '': 'major',
-            'm': 'minor',
-            'dim': 'diminished',
-            'aug': 'augmented',
-            '2': 'sus2',
-            '4': 'sus4',
-            '7sus4': '7sus4',
-            '7sus2': '7sus2',
-            '7sus13': '7sus13',
-            'sus13': 'sus13',
-            'Δ7': 'major7',
-            'Δ7#5': 'major7#5',
-            'm7': 'minor7',
-            'mΔ7': 'minor_major7',
-            'mΔ7(9)': 'minor_major9',
-            '7': 'dominant7',
-            'dim7': 'diminished7',
-            'dimΔ7': 'diminished_major7',
-            'ø7': 'half_diminished7',
-            '9': 'dominant9',
-            '11': 'dominant11',
-            '13': 'dominant13',
-            'Δ9': 'major9',
-            'm9': 'minor9',
-            'Δ11': 'major11',
-            'Δ7#11': 'major7#11',
-            'm11': 'minor11',
-            'Δ13': 'major13',
-            'Δ13#11': 'major13#11',
-            'm13': 'minor13',
-            '7alt': 'altered',
-            '5': '5',
-            '6': '6',
-            '6/9': '6_9',
-            'm6': 'minor6',
-            'm6/9': 'minor6_9',
-            'add9': 'add9',
-            'add11': 'add11',
-        }
+        quality = chord_name[root.end():]
 
         # Add patterns for shell voicings
         if quality == '13':
             # Could be any 13 variant
-            return chord_type in ['dominant13', '13_shell', '13_no5_no11', '13_no5']
+            return chord_type in _THIRTEEN_TYPES
 
-        return quality_map.get(quality) == chord_type
+        return _QUALITY_TO_TYPE.get(quality) == chord_type
 
     def _detect_chord_simple(self, active_notes: Set[int]) -> Optional[str]:
         """
@@ -1144,21 +1290,18 @@ class ChordDetector:
         if len(active_notes) < 2:
             return None
 
-        pitch_classes = sorted(set(note % 12 for note in active_notes))
+        lowest_note, highest_note, pc_mask = _note_bounds(active_notes)
+        pitch_classes = [pc for pc in range(12) if pc_mask >> pc & 1]
         if len(pitch_classes) < 2:
             return None
 
-        highest_note = max(active_notes)
         highest_pc = highest_note % 12
-        lowest_note = min(active_notes)
         lowest_pc = lowest_note % 12
 
         # GLOBAL dominant quality check
         has_global_dominant_quality = False
         for potential_root in pitch_classes:
-            m3_above = (potential_root + 4) % 12
-            m7_above = (potential_root + 10) % 12
-            if m3_above in pitch_classes and m7_above in pitch_classes:
+            if transpose_mask(pc_mask, -potential_root) & _DOMINANT_BITS == _DOMINANT_BITS:
                 has_global_dominant_quality = True
                 break
 
@@ -1166,7 +1309,7 @@ class ChordDetector:
         best_score = 0.0
 
         for root_pc in pitch_classes:
-            intervals = sorted((pc - root_pc) % 12 for pc in pitch_classes)
+            intervals = intervals_from(pc_mask, root_pc)
             match_result = self._match_chord_pattern(intervals, root_pc, active_notes, highest_note, highest_pc, lowest_pc, has_global_dominant_quality)
 
             if match_result:
@@ -1212,7 +1355,7 @@ class ChordDetector:
             # Triads (major, minor, dim, aug, sus)
             return 1
 
-    def _match_chord_pattern(self, intervals: List[int], root_pc: int,
+    def _match_chord_pattern(self, intervals: Tuple[int, ...], root_pc: int,
                             active_notes: Set[int],
                             highest_note: Optional[int] = None, highest_pc: Optional[int] = None,
                             lowest_pc: Optional[int] = None, has_global_dominant_quality: bool = False) -> Optional[Tuple[str, float]]:
@@ -1233,11 +1376,24 @@ class ChordDetector:
         best_score = 0.0
 
         # Count unique pitch classes in input (not total MIDI notes with octave duplicates)
-        input_pitch_class_count = len(set(note % 12 for note in active_notes))
+        input_pitch_class_count = _MASK_POPCOUNT[pcmask(active_notes)]
         intervals_set = set(intervals)
-
-        for chord_type, pattern in CHORD_PATTERNS.items():
-            pattern_set = set(pattern)
+        intervals_mask = pcmask(intervals)
+
+        for (chord_type, pattern, pattern_set, essential, optional,
+             pattern_mask, essential_mask, strict) in _CHORD_TEMPLATES:
+            # Cheap rejections on the packed masks first
+            matched_mask = pattern_mask & intervals_mask
+            # Require at least 2 total matched notes
+            if _MASK_POPCOUNT[matched_mask] < 2:
+                continue
+            # Must have at least ONE essential interval (unless the type defines none)
+            if essential_mask and not essential_mask & matched_mask:
+                continue
+            # For altered dominants with specific tensions (#11, #9), require ALL essential intervals
+            # This prevents 7b9#11 from matching when #11 is missing
+            if strict and essential_mask & ~matched_mask:
+                continue
 
             # Calculate matching notes
             matched_intervals = pattern_set & intervals_set
@@ -1247,30 +1403,10 @@ class ChordDetector:
             missing_intervals = pattern_set - intervals_set
             missing_count = len(missing_intervals)
 
-            # Get essential and optional intervals for this chord type
-            essential = set(ESSENTIAL_INTERVALS.get(chord_type, []))
-            optional = set(OPTIONAL_INTERVALS.get(chord_type, []))
-
             # Check if essential intervals are present (CRITICAL for jazz)
             essential_matched = essential & matched_intervals
             essential_missing = essential - matched_intervals
 
-            # For altered dominants with specific tensions (#11, #9), require ALL essential intervals
-            # This prevents 7b9#11 from matching when #11 is missing
-            if chord_type in ['7b9#11', '7#9#11', '7#9#11_shell',
-                             '7b9#11_shell', '7b9#11_no3'] and len(essential_missing) > 0:
-                # Missing essential intervals for specific altered chord - skip
-                continue
-
-            # Must have at least ONE essential interval (unless it's a simple triad with 2+ notes)
-            if len(essential) > 0 and len(essential_matched) == 0:
-                # No essential intervals matched - skip this chord type
-                continue
-
-            # If we have essential intervals, require at least 2 total matched notes
-            if matched_count < 2:
-                continue
-
             # IMPROVED SCORING FOR JAZZ VOICINGS:
 
             # 1. Essential interval bonus (PRIMARY FACTOR for jazz)
@@ -1397,22 +1533,22 @@ class ChordDetector:
 
             # Special case #1: C E Ab Bb → C7(b13)
             # Exact pattern [0, 4, 8, 10] as 7b13_no5 should be strongly preferred
-            if chord_type == '7b13_no5' and intervals == [0, 4, 8, 10]:
+            if chord_type == '7b13_no5' and intervals == (0, 4, 8, 10):
                 special_pattern_bonus = 100.0  # Strong boost for this exact pattern
 
             # Special case #1b: G7(b9,b13) - G F Ab Cb Eb
             # Exact pattern [0, 1, 4, 8, 10] as 7b9b13_no5
-            if chord_type == '7b9b13_no5' and intervals == [0, 1, 4, 8, 10]:
+            if chord_type == '7b9b13_no5' and intervals == (0, 1, 4, 8, 10):
                 special_pattern_bonus = 150.0  # Strong boost for this exact pattern
 
             # Special case #1c: G7(#9,b13) - G F Bb Cb Eb
             # Exact pattern [0, 3, 4, 8, 10] as 7#9b13_no5
-            if chord_type == '7#9b13_no5' and intervals == [0, 3, 4, 8, 10]:
+            if chord_type == '7#9b13_no5' and intervals == (0, 3, 4, 8, 10):
                 special_pattern_bonus = 150.0  # Strong boost for this exact pattern
 
             # Special case #1d: C7(b9,#11) - C Bb Db E F#
             # Exact pattern [0, 1, 4, 6, 10] as 7b9#11_no5
-            if chord_type == '7b9#11_no5' and intervals == [0, 1, 4, 6, 10]:
+            if chord_type == '7b9#11_no5' and intervals == (0, 1, 4, 6, 10):
                 special_pattern_bonus = 400.0  # Very strong boost to beat 13#11 interpretations
 
             # Special handling for m6 slash chord pattern: bass + [1, 7, 10] = X Xb/bass
@@ -1433,7 +1569,7 @@ class ChordDetector:
 
             # Special case #1e: C E A → C6 (not Am/C)
             # Prefer 6th chord interpretation over minor triad inversion when root is in bass
-            if chord_type in ['6_no5', '6'] and root_pc == lowest_pc and intervals == [0, 4, 9]:
+            if chord_type in ['6_no5', '6'] and root_pc == lowest_pc and intervals == (0, 4, 9):
                 special_pattern_bonus = 100.0  # Strong boost to prefer 6th over minor inversion
 
             # Special case #1f: add9 chords - use chord span to decide add9/bass vs 9sus
@@ -1510,14 +1646,14 @@ class ChordDetector:
                 unique_pcs_m6_check = len(set(note % 12 for note in active_notes))
                 if 3 in intervals_set and 9 in intervals_set and unique_pcs_m6_check == 4:  # m3 + M6 present, exactly 4 notes
                     # Extra strong boost for this specific pattern
-                    if intervals == [0, 2, 3, 9]:  # Exact pattern like Bbm6 with added 9
+                    if intervals == (0, 2, 3, 9):  # Exact pattern like Bbm6 with added 9
                         special_pattern_bonus = 600.0  # Extremely strong boost for exact m6 pattern
                     else:
                         special_pattern_bonus = 400.0  # Very strong boost for m6 slash chords (4 notes only)
 
             # Special case #1f2: half-diminished7 should beat 7#11 when it's a perfect match
             # Example: Ab Cb D F# should be Abø7, not Ab7#11
-            if chord_type == 'half_diminished7' and intervals == [0, 3, 6, 10]:
+            if chord_type == 'half_diminished7' and intervals == (0, 3, 6, 10):
                 if missing_count == 0 and extra_count == 0:
                     special_pattern_bonus = 180.0  # Beat 7#11 interpretations
 
@@ -1546,7 +1682,7 @@ class ChordDetector:
 
             # Special case #2b: F A B E → F maj7#11 (not B7#11)
             # Exact pattern [0, 4, 6, 11] as major7#11_no5
-            if chord_type == 'major7#11_no5' and intervals == [0, 4, 6, 11]:
+            if chord_type == 'major7#11_no5' and intervals == (0, 4, 6, 11):
                 special_pattern_bonus = 300.0  # Very strong boost to beat B7#11
 
             # Special case #2c: 6/9 chords should beat m11 interpretations but lose to maj7(6/9)
@@ -1610,7 +1746,7 @@ class ChordDetector:
 
             # Special case #2e: E A Bb D → Em7b5(11) (specific voicing with A as 2nd note)
             # Check if this is the specific voicing: E in bass, A as 2nd note, pattern [0, 5, 6, 10]
-            if chord_type == 'half_diminished11_no3' and intervals == [0, 5, 6, 10]:
+            if chord_type == 'half_diminished11_no3' and intervals == (0, 5, 6, 10):
                 # Check voicing - A (interval 5) must be the second note above E bass
                 sorted_notes = sorted(active_notes)
                 if len(sorted_notes) >= 2 and root_pc == lowest_pc:
@@ -1701,7 +1837,7 @@ class ChordDetector:
                         special_pattern_bonus = -200.0  # Penalize Bb6/C for non-1st-inversion
 
             # When the specific pattern [0, 2, 4, 7, 9] is present (Bb in bass, same notes):
-            if intervals == [0, 2, 4, 7, 9] and chord_type == '6':
+            if intervals == (0, 2, 4, 7, 9) and chord_type == '6':
                 # This is the Bb6 pattern (C Bb D F G with Bb lowest)
                 special_pattern_bonus = 200.0  # Very strong boost for this specific voicing
 
@@ -2005,34 +2141,24 @@ class ChordDetector:
         scale_span = max(active_notes) - min(active_notes)
         is_within_octave = scale_span < 12
 
-        # Scales that should only be detected when clustered OR within one octave
-        clustered_only_scales = {
-            'Major Pentatonic', 'Minor Pentatonic',
-            'Major Blues', 'Minor Blues',
-            'Whole Tone'
-        }
-
         # Try all pitch classes as potential roots, but prefer the lowest note
         best_match = None
         best_score = 0
 
         for root_pc in pitch_classes:
             # Calculate intervals from this root
-            intervals = sorted((pc - root_pc) % 12 for pc in pitch_classes)
+            intervals_set = {(pc - root_pc) % 12 for pc in pitch_classes}
 
             # Match against scale patterns
-            for scale_name, pattern in SCALE_PATTERNS.items():
+            for scale_name, pattern_set in _SCALE_TEMPLATES:
                 # Skip clustered-only scales if notes are not clustered AND not within one octave
-                if scale_name in clustered_only_scales and not (is_clustered or is_within_octave):
+                if scale_name in _CLUSTERED_ONLY_SCALES and not (is_clustered or is_within_octave):
                     continue
 
                 # For Whole Tone, require at least 6 notes
                 if scale_name == 'Whole Tone' and len(pitch_classes) < 6:
                     continue
 
-                pattern_set = set(pattern)
-                intervals_set = set(intervals)
-
                 # Check if all pattern notes are present
                 if pattern_set.issubset(intervals_set):
                     # Calculate match quality
@@ -2043,22 +2169,9 @@ class ChordDetector:
                     if extra == 0:
                         score = 5000 + matched  # Massive boost for perfect scale/mode matches
 
-                        # Extra bonuses for important mode categories
-                        # Major modes (Ionian through Locrian)
-                        major_modes = {'Ionian', 'Dorian', 'Phrygian', 'Lydian', 'Mixolydian', 'Aeolian', 'Locrian'}
-                        # Melodic minor modes
-                        melodic_minor_modes = {'Melodic Minor', 'Dorian b2', 'Lydian Augmented', 'Lydian Dominant',
-                                              'Mixolydian b6', 'Locrian #2', 'Altered'}
-                        # Harmonic minor modes
-                        harmonic_minor_modes = {'Harmonic Minor', 'Locrian #6', 'Ionian #5', 'Dorian #4',
-                                               'Phrygian Dominant', 'Lydian #2', 'Altered Diminished'}
-
-                        if scale_name in major_modes:
-                            score += 1000  # Huge bonus for perfect major mode match
-                        elif scale_name in melodic_minor_modes:
-                            score += 1000  # Huge bonus for perfect melodic minor mode match
-                        elif scale_name in harmonic_minor_modes:
-                            score += 1000  # Huge bonus for perfect harmonic minor mode match
+                        # Extra bonus for major, melodic minor and harmonic minor modes
+                        if scale_name in _MODE_SCALES:
+                            score += 1000  # Huge bonus for perfect mode match
                     else:
                         # Allow some extra notes but penalize
                         score = matched * 10 - extra * 5
@@ -2074,9 +2187,19 @@ class ChordDetector:
 
         return best_match
 
+
+class _ChordTestCase(NamedTuple):
+    """One self-test case: MIDI notes and the chord name they should produce"""
+    notes: frozenset
+    expected: Optional[str]
+    notes_sorted: Tuple[int, ...]  # Display order for the report
+
+
 def test_chord_detector():
     """Test the chord detector with example chords"""
     detector = ChordDetector()
+    # IVORY_TEST_VERBOSE=0 reports only failures and the summary
+    verbose = os.environ.get('IVORY_TEST_VERBOSE', '1') != '0'
 
     # Test cases: (MIDI notes, expected chord)
     test_cases = [
@@ -2126,26 +2249,31 @@ def test_chord_detector():
         ({60, 62, 63, 65, 67, 68, 70}, "C Aeolian"),  # C Aeolian (natural minor): C, D, Eb, F, G, Ab, Bb
         ({62, 64, 65, 67, 69, 71, 72}, "D Dorian"),  # D Dorian: D, E, F, G, A, B, C
     ]
+    test_cases = [_ChordTestCase(frozenset(notes), sys.intern(expected), tuple(sorted(notes)))
+                  for notes, expected in test_cases]
 
-    print("Testing Chord Detector (Jazz-Aware Algorithm):")
-    print("=" * 60)
+    # Collect the report and write it in one go instead of a print per line
+    out = ["Testing Chord Detector (Jazz-Aware Algorithm):", "=" * 60]
 
     passed = 0
     failed = 0
-    for notes, expected in test_cases:
-        detected = detector.detect_chord(notes)
-        if detected == expected:
-            status = "✓"
+    results = [detector.detect_chord(case.notes) for case in test_cases]
+    for case, detected in zip(test_cases, results):
+        if detected == case.expected:
             passed += 1
+            if not verbose:
+                continue
+            status = "✓"
         else:
             status = "✗"
             failed += 1
-        print(f"{status} Notes: {sorted(notes)}")
-        print(f"  Expected: {expected}, Got: {detected}")
+        out.append(f"{status} Notes: [{', '.join(map(str, case.notes_sorted))}]")
+        out.append(f"  Expected: {case.expected}, Got: {detected}")
 
-    print("=" * 60)
-    print(f"Results: {passed} passed, {failed} failed")
-    print("=" * 60)
+    out.append("=" * 60)
+    out.append(f"Results: {passed} passed, {failed} failed")
+    out.append("=" * 60)
+    sys.stdout.write("\n".join(out) + "\n")
 
 if __name__ == "__main__":
     test_chord_detector()
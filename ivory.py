@@ -6,12 +6,14 @@ Cross-platform application built with PyQt5
 
 import sys
 import time
-import argparse
 import json
+import logging
 import os
-import threading
-from collections import defaultdict
-from typing import Dict, Set, Optional, Tuple
+import re
+import traceback
+from collections import defaultdict, deque
+from functools import lru_cache, partial
+from typing import NamedTuple, Set, Optional, Tuple
 from pathlib import Path
 
 # PyInstaller support: get resource path
@@ -24,6 +26,56 @@ def resource_path(relative_path):
         base_path = os.path.abspath(os.path.dirname(__file__))
     return os.path.join(base_path, relative_path)
 
+_log = logging.getLogger('ivory')
+
+# Check for dependencies only when actually needed (result cached after first import)
+@lru_cache(maxsize=1)
+def check_dependencies():
+    """Check if required dependencies are available"""
+    try:
+        import mido
+        from mido import Message
+    except ImportError:
+        print("Error: mido library not found. Install it with:")
+        print("  pip install mido python-rtmidi")
+        sys.exit(1)
+    
+    return mido, Message
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    import argparse  # Only needed past the --list fast path
+    
+    parser = argparse.ArgumentParser(
+        description="PyQt5 MIDI keyboard monitor with chord detection",
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    
+    parser.add_argument('-p', '--port', type=str, help='MIDI input port name')
+    parser.add_argument('-l', '--list', action='store_true', help='List available MIDI ports')
+    
+    return parser.parse_args(argv)
+
+def list_midi_ports():
+    """Print available MIDI input ports"""
+    mido, _ = check_dependencies()
+    print("Available MIDI Input Ports:")
+    ports = mido.get_input_names()
+    if ports:
+        for i, port in enumerate(ports):
+            print(f"  {i}: {port}")
+    else:
+        print("  No MIDI input ports found!")
+
+# Arguments are parsed before the chord detector and PyQt5 are imported so that
+# --list (and --help) only pay for mido
+if __name__ == '__main__':
+    # Plain `ivory -l` skips argparse entirely; only GUI runs continue past here
+    _args = None if sys.argv[1:] in (['-l'], ['--list']) else parse_args()
+    if _args is None or _args.list:
+        list_midi_ports()
+        sys.exit(0)
+
 # Import chord detector
 try:
     from chord_detector import ChordDetector
@@ -37,9 +89,10 @@ try:
     from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                                   QMenu, QMessageBox, QDialog, QLabel, QListWidget,
                                   QDialogButtonBox, QColorDialog, QLineEdit, QPushButton,
-                                  QHBoxLayout, QFrame, QSizePolicy, QTextBrowser)
-    from PyQt5.QtCore import Qt, QTimer, QPoint, QSize, pyqtSignal, QSharedMemory, QSystemSemaphore, QEvent
-    from PyQt5.QtGui import QPainter, QColor, QFont, QFontMetrics, QPen, QBrush, QIcon, QMouseEvent, QContextMenuEvent
+                                  QHBoxLayout, QFrame, QSizePolicy, QTextBrowser, QWIDGETSIZE_MAX)
+    from PyQt5.QtCore import (Qt, QTimer, QPoint, QSize, pyqtSignal, QSharedMemory, QSystemSemaphore,
+                              QEvent, QSignalBlocker, QRunnable, QThreadPool)
+    from PyQt5.QtGui import QPainter, QColor, QFont, QFontDatabase, QFontMetrics, QPen, QBrush, QIcon, QContextMenuEvent
     PYQT5_AVAILABLE = True
 except ImportError as e:
     print(f"Error: PyQt5 is required. Install with:")
@@ -47,19 +100,6 @@ except ImportError as e:
     print(f"Import error: {e}")
     sys.exit(1)
 
-# Check for dependencies only when actually needed
-def check_dependencies():
-    """Check if required dependencies are available"""
-    try:
-        import mido
-        from mido import Message
-    except ImportError:
-        print("Error: mido library not found. Install it with:")
-        print("  pip install mido python-rtmidi")
-        sys.exit(1)
-    
-    return mido, Message
-
 # Import mido only when needed
 mido = None
 Message = None
@@ -72,12 +112,29 @@ KEYBOARD_START_NOTE = 21  # A0
 KEYBOARD_END_NOTE = 108   # C8
 KEYBOARD_TOTAL_KEYS = 88
 
+# MIDI port auto-select priority (lower wins): USB-MIDI, then Scarlett or any USB MIDI device
+_PORT_PRIORITY = [
+    (re.compile(r'USB-MIDI'), 0),
+    (re.compile(r'Scarlett|USB.*MIDI|MIDI.*USB'), 1),
+]
+
 def note_name(note_number: int) -> str:
     """Convert MIDI note number to name (e.g., 60 -> 'C4')"""
     octave = (note_number // 12) - 1
     note = NOTE_NAMES[note_number % 12]
     return f"{note}{octave}"
 
+def _qcolor(hex_str: str) -> QColor:
+    """Build a QColor from a '#rrggbb' string without going through Qt's name parser"""
+    if isinstance(hex_str, str) and len(hex_str) == 7 and hex_str[0] == '#':
+        try:
+            v = int(hex_str[1:], 16)
+        except ValueError:
+            pass
+        else:
+            return QColor.fromRgb((v >> 16) & 0xff, (v >> 8) & 0xff, v & 0xff)
+    return QColor(hex_str)
+
 def is_white_key(note_number: int) -> bool:
     """Check if a MIDI note is a white key"""
     note_in_octave = note_number % 12
@@ -130,7 +187,7 @@ class PianoWidget(QWidget):
     
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.active_notes: Dict[int, Dict] = {}
+        self.active_mask = 0  # Bit n set while MIDI note n is sounding
         self.sustain_pedal_active = False
         
         # Color settings
@@ -169,9 +226,9 @@ class PianoWidget(QWidget):
         if parent and hasattr(parent, 'show_context_menu'):
             parent.show_context_menu(self.mapToGlobal(pos))
     
-    def set_active_notes(self, notes: Dict[int, Dict]):
-        """Update active notes"""
-        self.active_notes = notes
+    def set_active_mask(self, mask: int):
+        """Update active notes (bit n set for each sounding MIDI note n)"""
+        self.active_mask = mask
         self.update()
     
     def set_sustain_pedal(self, active: bool):
@@ -264,7 +321,7 @@ class PianoWidget(QWidget):
             x = idx * self.white_key_width
             
             # Determine fill color
-            if note in self.active_notes:
+            if self.active_mask >> note & 1:
                 if self.sustain_pedal_active:
                     fill_color = self.sustain_color
                 else:
@@ -323,7 +380,7 @@ class PianoWidget(QWidget):
                     continue
                 
                 # Determine fill color
-                if note in self.active_notes:
+                if self.active_mask >> note & 1:
                     if self.sustain_pedal_active:
                         fill_color = self.sustain_color
                     else:
@@ -362,6 +419,8 @@ class ChordLabelWidget(QWidget):
     
     def set_chord(self, chord: Optional[str]):
         """Update chord text"""
+        if chord == self.current_chord:
+            return
         self.current_chord = chord
         self.update()
     
@@ -393,11 +452,7 @@ class ChordLabelWidget(QWidget):
         font_size = max(12, int(self.height() * 0.6))
         
         # Set font - use Courier New (non-bold), fallback to Courier, then monospace
-        font = QFont("Courier New", font_size, QFont.Normal)
-        if not font.exactMatch():
-            font = QFont("Courier", font_size, QFont.Normal)
-        if not font.exactMatch():
-            font = QFont("monospace", font_size, QFont.Normal)
+        font = QFont(_mono_family(), font_size, QFont.Normal)
         
         painter.setFont(font)
         painter.setPen(QColor(232, 220, 192))  # #E8DCC0
@@ -427,29 +482,185 @@ class ChordLabelWidget(QWidget):
         painter.drawText(int(text_x), int(text_y), self.current_chord)
 
 
+@lru_cache(maxsize=1)
+def _mono_family() -> str:
+    """Courier New, falling back to Courier then monospace (font database probed once)"""
+    # QFontDatabase().families() is expensive and needs the QApplication, so probe lazily
+    families = set(QFontDatabase().families())
+    for family in ("Courier New", "Courier"):
+        if family in families:
+            return family
+    return "monospace"
+
+
+@lru_cache(maxsize=None)
+def _mono_font(size: int, bold: bool) -> QFont:
+    """Monospace font for dialogs (cached per size/weight)"""
+    return QFont(_mono_family(), size, QFont.Bold if bold else QFont.Normal)
+
+
+def _about_stylesheet(bg_color: str, text_color: str, button_bg: str,
+                      button_hover: str, button_border: str) -> str:
+    """Build the About dialog stylesheet for one color theme"""
+    return f"""
+            QDialog {{
+                background-color: {bg_color};
+                color: {text_color};
+            }}
+            QLabel {{
+                background-color: {bg_color};
+                color: {text_color};
+                font-family: "Courier New", Courier, monospace;
+                font-weight: bold;
+            }}
+            QLabel a {{
+                color: {text_color};
+            }}
+            QDialogButtonBox {{
+                background-color: {bg_color};
+            }}
+            QPushButton {{
+                background-color: {button_bg};
+                color: {text_color};
+                border: 1px solid {button_border};
+                padding: 4px 12px;
+                font-family: "Courier New", Courier, monospace;
+                font-weight: bold;
+            }}
+            QPushButton:hover {{
+                background-color: {button_hover};
+            }}
+        """
+
+
+def _menu_stylesheet(bg_color: str, text_color: str, separator_color: str, selected_bg: str) -> str:
+    """Build the context menu stylesheet for one color theme"""
+    return f"""
+            QMenu {{
+                background-color: {bg_color};
+                color: {text_color};
+                border: 1px solid {bg_color};
+                font-family: "Courier New", Courier, monospace;
+                font-weight: bold;
+            }}
+            QMenu::item {{
+                background-color: transparent;
+                padding: 4px 20px 4px 20px;
+                font-family: "Courier New", Courier, monospace;
+                font-weight: bold;
+            }}
+            QMenu::item:selected {{
+                background-color: {selected_bg};
+            }}
+            QMenu::separator {{
+                height: 1px;
+                background-color: {separator_color};
+                margin: 1px 0px 1px 0px;
+            }}
+        """
+
+
+class _MidiCloseRunnable(QRunnable):
+    """Close a MIDI input port on a worker thread (RtMidi close can block)"""
+    
+    def __init__(self, port):
+        super().__init__()
+        self._port = port
+    
+    def run(self):
+        try:
+            self._port.close()
+        except Exception:
+            pass
+
+
+class _LayoutSizes(NamedTuple):
+    """Window geometry derived from one width"""
+    width: int
+    scale: float
+    piano_height: int
+    chord_height: int  # 0 when the attached chord label is hidden
+    total_height: int
+
+
 class MIDIMonitor(QMainWindow):
     """Main application window"""
     
+    # Emitted (on the GUI thread) whenever incoming MIDI changes the sounding notes
+    notes_changed = pyqtSignal()
+    
+    # Chord detector failures are logged at most once per interval (seconds)
+    CHORD_ERROR_LOG_INTERVAL = 60.0
+    
+    # Attached chord label height at 100% size (scaled with window width)
+    CHORD_BASE_HEIGHT = 50
+    
+    # Context menu themes: ivory on black (dark mode) or black on ivory (light mode)
+    _MENU_CSS_DARK = _menu_stylesheet("#000000", "#E8DCC0", "#E8DCC0", "#1a1a1a")
+    _MENU_CSS_LIGHT = _menu_stylesheet("#E8DCC0", "#000000", "#000000", "#d4c8b0")
+    
+    # About dialog themes, same palette as the context menu
+    _ABOUT_QSS_DARK = _about_stylesheet("#000000", "#E8DCC0", "#1a1a1a", "#2a2a2a", "#E8DCC0")
+    _ABOUT_QSS_LIGHT = _about_stylesheet("#E8DCC0", "#000000", "#d4c8b0", "#c0b49c", "#000000")
+    
+    # Settings changes are written to disk this long after the last change (ms)
+    SETTINGS_FLUSH_DELAY = 500
+    
+    # Piano background colors
+    _PIANO_BG_DARK = QColor(26, 26, 26)  # #1a1a1a
+    _PIANO_BG_LIGHT = QColor(232, 232, 232)  # #E8E8E8
+    
     def __init__(self, port_name: Optional[str] = None):
         super().__init__()
         
         self.port_name = port_name
-        self.active_notes: Dict[int, Dict] = {}
-        self.notes_to_release: set = set()
+        self._active_mask = 0  # Bit n set while MIDI note n is sounding
+        self._release_mask = 0  # Bit n set for notes held only by the sustain pedal
         self.sustain_pedal_active = False
-        self.midi_thread_running = False
+        # Filled by the MIDI backend's callback thread, drained on the GUI thread
+        # (deque append/popleft are atomic, so no lock is needed). Unbounded so a
+        # stalled GUI thread can never lose a note-off or pedal release.
+        self._midi_queue = deque()
         self.chord_window_detached = False  # Initialize chord window state
         self._base_width = 1300  # Base width for percentage sizing
         self._window_size_percent = 100  # Current window size percentage
         self._borderless_mode = False  # Borderless window mode
+        self._detached_chord_height = 50  # Height of detached chord window
+        self._drag_position = None  # Set while dragging a borderless window
+        # Borderless drag handlers keyed by event type; handlers take (window, event)
+        # and return whether the event was consumed
+        self._drag_handlers = {
+            QEvent.MouseButtonPress: self._on_drag_press,
+            QEvent.MouseMove: self._on_drag_move,
+            QEvent.MouseButtonRelease: self._on_drag_release,
+        }
+        # Debounces detached chord window width updates while resizing/dragging
+        self._chord_width_update_timer = QTimer(self)
+        self._chord_width_update_timer.setSingleShot(True)
+        self._chord_width_update_timer.timeout.connect(self._safe_update_chord_window_width)
+        self._layout_pending = False  # Initial layout scheduled from showEvent
+        self._positioning = False  # Guards _position_widgets against re-entry
+        # Window size requested by toggles; applied once per event loop pass
+        self._pending_layout = None
+        self._layout_timer = QTimer(self)
+        self._layout_timer.setSingleShot(True)
+        self._layout_timer.setInterval(0)
+        self._layout_timer.timeout.connect(self._flush_layout)
         self.inport = None
         self.actual_port_name = None
         
+        # Widgets - created in init_ui(), None until then so resize and
+        # layout handlers can use plain reads instead of hasattr() probes
+        self.piano_widget = None
+        self.chord_label = None
+        
         # Chord detection
         self.chord_detection_enabled = True if CHORD_DETECTOR_AVAILABLE else False
         self.chord_window_detached = False
         self.chord_window = None
         self.current_chord = None
+        self._last_chord_mask = None  # Note mask of the last detection
+        self._chord_error_logged_at = None  # time.monotonic() of the last logged failure
         if CHORD_DETECTOR_AVAILABLE:
             self.chord_detector = ChordDetector()
         else:
@@ -458,6 +669,14 @@ class MIDIMonitor(QMainWindow):
         # Settings
         self.config_file = Path.home() / ".config" / "ivory" / "settings.json"
         self.load_settings()
+        # In-memory copy of what is on disk; save_settings() marks changed keys
+        # dirty and _flush_settings() writes them once the user stops changing things
+        self._settings_cache = self._settings_snapshot()
+        self._settings_dirty: Set[str] = set()
+        self._flush_settings_timer = QTimer(self)
+        self._flush_settings_timer.setSingleShot(True)
+        self._flush_settings_timer.setInterval(self.SETTINGS_FLUSH_DELAY)
+        self._flush_settings_timer.timeout.connect(self._flush_settings)
         
         # Update chord detector preferences
         if self.chord_detector:
@@ -466,15 +685,14 @@ class MIDIMonitor(QMainWindow):
         # Initialize UI
         self.init_ui()
         
+        # Detect chords only when incoming MIDI changes the sounding notes
+        if CHORD_DETECTOR_AVAILABLE and self.chord_detector:
+            self.notes_changed.connect(self._request_chord_update)
+        
         # Connect MIDI
         self.connect_midi()
         
-        # Start update timers
-        if CHORD_DETECTOR_AVAILABLE and self.chord_detector:
-            self.chord_timer = QTimer()
-            self.chord_timer.timeout.connect(self.update_chord_detection)
-            self.chord_timer.start(100)  # Update every 100ms
-        
+        # Start update timer
         self.update_timer = QTimer()
         self.update_timer.timeout.connect(self.update_gui)
         self.update_timer.start(50)  # Update every 50ms
@@ -500,26 +718,26 @@ class MIDIMonitor(QMainWindow):
             try:
                 with open(self.config_file, 'r') as f:
                     config = json.load(f)
-                    self.dark_mode = config.get("dark_mode", defaults["dark_mode"])
-                    self.white_key_idle_color = QColor(config.get("white_key_idle_color", defaults["white_key_idle_color"]))
-                    self.black_key_idle_color = QColor(config.get("black_key_idle_color", defaults["black_key_idle_color"]))
-                    self.white_key_active_color = QColor(config.get("white_key_active_color", defaults["white_key_active_color"]))
-                    self.black_key_active_color = QColor(config.get("black_key_active_color", defaults["black_key_active_color"]))
-                    self.sustain_color = QColor(config.get("sustain_color", defaults["sustain_color"]))
-                    self.prefer_flats = config.get("prefer_flats", defaults["prefer_flats"])
-                    self.chord_detection_enabled = config.get("chord_detection_enabled", defaults["chord_detection_enabled"])
-                    self._window_size_percent = config.get("window_size_percent", defaults["window_size_percent"])
-                    self._borderless_mode = config.get("borderless_mode", defaults["borderless_mode"])
-                    self.chord_window_detached = config.get("chord_window_detached", defaults["chord_window_detached"])
-                    self._detached_chord_height = config.get("detached_chord_height", defaults["detached_chord_height"])
+                self.dark_mode = config.get("dark_mode", defaults["dark_mode"])
+                self.white_key_idle_color = _qcolor(config.get("white_key_idle_color", defaults["white_key_idle_color"]))
+                self.black_key_idle_color = _qcolor(config.get("black_key_idle_color", defaults["black_key_idle_color"]))
+                self.white_key_active_color = _qcolor(config.get("white_key_active_color", defaults["white_key_active_color"]))
+                self.black_key_active_color = _qcolor(config.get("black_key_active_color", defaults["black_key_active_color"]))
+                self.sustain_color = _qcolor(config.get("sustain_color", defaults["sustain_color"]))
+                self.prefer_flats = config.get("prefer_flats", defaults["prefer_flats"])
+                self.chord_detection_enabled = config.get("chord_detection_enabled", defaults["chord_detection_enabled"])
+                self._window_size_percent = config.get("window_size_percent", defaults["window_size_percent"])
+                self._borderless_mode = config.get("borderless_mode", defaults["borderless_mode"])
+                self.chord_window_detached = config.get("chord_window_detached", defaults["chord_window_detached"])
+                self._detached_chord_height = config.get("detached_chord_height", defaults["detached_chord_height"])
             except Exception:
                 # Use defaults on error
                 self.dark_mode = defaults["dark_mode"]
-                self.white_key_idle_color = QColor(defaults["white_key_idle_color"])
-                self.black_key_idle_color = QColor(defaults["black_key_idle_color"])
-                self.white_key_active_color = QColor(defaults["white_key_active_color"])
-                self.black_key_active_color = QColor(defaults["black_key_active_color"])
-                self.sustain_color = QColor(defaults["sustain_color"])
+                self.white_key_idle_color = _qcolor(defaults["white_key_idle_color"])
+                self.black_key_idle_color = _qcolor(defaults["black_key_idle_color"])
+                self.white_key_active_color = _qcolor(defaults["white_key_active_color"])
+                self.black_key_active_color = _qcolor(defaults["black_key_active_color"])
+                self.sustain_color = _qcolor(defaults["sustain_color"])
                 self.prefer_flats = defaults["prefer_flats"]
                 self.chord_detection_enabled = defaults["chord_detection_enabled"]
                 self._window_size_percent = defaults["window_size_percent"]
@@ -529,11 +747,11 @@ class MIDIMonitor(QMainWindow):
         else:
             # Use defaults
             self.dark_mode = defaults["dark_mode"]
-            self.white_key_idle_color = QColor(defaults["white_key_idle_color"])
-            self.black_key_idle_color = QColor(defaults["black_key_idle_color"])
-            self.white_key_active_color = QColor(defaults["white_key_active_color"])
-            self.black_key_active_color = QColor(defaults["black_key_active_color"])
-            self.sustain_color = QColor(defaults["sustain_color"])
+            self.white_key_idle_color = _qcolor(defaults["white_key_idle_color"])
+            self.black_key_idle_color = _qcolor(defaults["black_key_idle_color"])
+            self.white_key_active_color = _qcolor(defaults["white_key_active_color"])
+            self.black_key_active_color = _qcolor(defaults["black_key_active_color"])
+            self.sustain_color = _qcolor(defaults["sustain_color"])
             self.prefer_flats = defaults["prefer_flats"]
             self.chord_detection_enabled = defaults["chord_detection_enabled"]
             self._window_size_percent = defaults["window_size_percent"]
@@ -541,9 +759,9 @@ class MIDIMonitor(QMainWindow):
             self.chord_window_detached = defaults["chord_window_detached"]
             self._detached_chord_height = defaults["detached_chord_height"]
     
-    def save_settings(self):
-        """Save settings to file"""
-        config = {
+    def _settings_snapshot(self) -> dict:
+        """Current settings as a JSON-serializable dict"""
+        return {
             "dark_mode": self.dark_mode,
             "white_key_idle_color": self.white_key_idle_color.name(),
             "black_key_idle_color": self.black_key_idle_color.name(),
@@ -552,19 +770,46 @@ class MIDIMonitor(QMainWindow):
             "sustain_color": self.sustain_color.name(),
             "prefer_flats": self.prefer_flats,
             "chord_detection_enabled": self.chord_detection_enabled,
-            "window_size_percent": getattr(self, '_window_size_percent', 100),
-            "borderless_mode": getattr(self, '_borderless_mode', False),
-            "chord_window_detached": getattr(self, 'chord_window_detached', False),
-            "detached_chord_height": getattr(self, '_detached_chord_height', 50)
+            "window_size_percent": self._window_size_percent,
+            "borderless_mode": self._borderless_mode,
+            "chord_window_detached": self.chord_window_detached,
+            "detached_chord_height": self._detached_chord_height
         }
+    
+    def save_settings(self):
+        """Record changed settings and schedule a debounced write to file"""
+        for key, value in self._settings_snapshot().items():
+            if self._settings_cache.get(key) != value:
+                self._settings_cache[key] = value
+                self._settings_dirty.add(key)
+        if self._settings_dirty:
+            self._flush_settings_timer.start()
+    
+    def _flush_settings(self):
+        """Write settings to file if anything changed since the last write"""
+        self._flush_settings_timer.stop()
+        if not self._settings_dirty:
+            return
         
         self.config_file.parent.mkdir(parents=True, exist_ok=True)
         
+        # Write to a temp file and rename over the original so a crash mid-write
+        # can never leave a truncated settings file behind
+        tmp_file = self.config_file.with_suffix('.tmp')
         try:
-            with open(self.config_file, 'w') as f:
-                json.dump(config, f, indent=2)
+            with open(tmp_file, 'w') as f:
+                json.dump(self._settings_cache, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.config_file)
         except Exception:
-            pass
+            # Don't leave a partial temp file in the config directory
+            try:
+                tmp_file.unlink()
+            except OSError:
+                pass
+            return  # Leave keys dirty so the next flush retries
+        self._settings_dirty.clear()
     
     def init_ui(self):
         """Initialize the user interface"""
@@ -608,7 +853,7 @@ class MIDIMonitor(QMainWindow):
             self.chord_label.set_chord(None)
             self.chord_label.setVisible(self.chord_detection_enabled)
             # Set flexible height constraints
-            self.chord_label.setMinimumHeight(50)
+            self.chord_label.setMinimumHeight(self.CHORD_BASE_HEIGHT)
             self.chord_label.setMaximumHeight(500)
             self.chord_label.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
             # Install event filter for borderless dragging
@@ -641,7 +886,7 @@ class MIDIMonitor(QMainWindow):
         # Apply saved window size percentage
         scale = self._window_size_percent / 100.0
         initial_width = int(default_width * scale)
-        chord_height = int(50 * scale) if (CHORD_DETECTOR_AVAILABLE and self.chord_detection_enabled and not self.chord_window_detached) else 0
+        chord_height = int(self.CHORD_BASE_HEIGHT * scale) if (CHORD_DETECTOR_AVAILABLE and self.chord_detection_enabled and not self.chord_window_detached) else 0
         piano_height = int(initial_width / self.piano_widget.piano_aspect)
         initial_height = chord_height + piano_height
         
@@ -657,22 +902,20 @@ class MIDIMonitor(QMainWindow):
         print(f"DEBUG init_ui: Set fixed size: {initial_width}x{initial_height}")
         print(f"DEBUG init_ui: Window visible: {self.isVisible()}")
         
-        # Restore chord window detached state if saved
-        if self.chord_window_detached and CHORD_DETECTOR_AVAILABLE and self.chord_detection_enabled:
-            # Will be created after window is shown
-            QTimer.singleShot(100, self.create_chord_window)
+        # Restore chord window detached state if saved - done by
+        # _initial_layout() once the window is shown
     
     def set_window_size_percent(self, percent: int):
         """Set window size as percentage of base size"""
         self._window_size_percent = percent
-        scale = percent / 100.0
-        new_width = int(self._base_width * scale)
-        
-        # Calculate heights based on new width - SCALE chord height proportionally
-        piano_height = int(new_width / self.piano_widget.piano_aspect)
-        # Base chord height is 50px at 100% - scale it with the percentage
-        base_chord_height = 50
-        chord_height = int(base_chord_height * scale) if (CHORD_DETECTOR_AVAILABLE and self.chord_detection_enabled and not self.chord_window_detached) else 0
+        new_width = int(self._base_width * (percent / 100.0))
+        
+        # Calculate heights based on new width - chord height scales with it
+        sizes = self._compute_layout_sizes(new_width)
+        scale = sizes.scale
+        piano_height = sizes.piano_height
+        # A detached chord window takes no room in the main window
+        chord_height = 0 if self.chord_window_detached else sizes.chord_height
         new_height = chord_height + piano_height
         
         # Update fixed size (window is always non-resizable)
@@ -680,20 +923,20 @@ class MIDIMonitor(QMainWindow):
         
         # CRITICAL: Position widgets immediately with new sizes
         # Don't wait for resizeEvent - update directly
-        if hasattr(self, 'piano_widget') and self.piano_widget:
+        if self.piano_widget is not None:
             # Update piano widget size
             self.piano_widget.setFixedSize(new_width, piano_height)
             self.piano_widget.setGeometry(0, chord_height, new_width, piano_height)
         
         if (CHORD_DETECTOR_AVAILABLE and self.chord_detection_enabled and 
-            not self.chord_window_detached and hasattr(self, 'chord_label') and self.chord_label):
+            not self.chord_window_detached and self.chord_label is not None):
             # Update chord label size - SCALE IT
             self.chord_label.setFixedSize(new_width, chord_height)
             self.chord_label.setGeometry(0, 0, new_width, chord_height)
             self.chord_label.setVisible(True)
             # Update min/max heights to scale proportionally too
-            self.chord_label.setMinimumHeight(int(50 * scale))
-            self.chord_label.setMaximumHeight(int(500 * scale))
+            self.chord_label.setMinimumHeight(int(self.CHORD_BASE_HEIGHT * scale))
+            self.chord_label.setMaximumHeight(int(10 * self.CHORD_BASE_HEIGHT * scale))
         
         # Update central widget
         central_widget = self.centralWidget()
@@ -702,9 +945,9 @@ class MIDIMonitor(QMainWindow):
         
         # Force update to redraw
         self.update()
-        if hasattr(self, 'piano_widget'):
+        if self.piano_widget is not None:
             self.piano_widget.update()
-        if hasattr(self, 'chord_label') and self.chord_label:
+        if self.chord_label is not None:
             self.chord_label.update()
         
         # Save settings
@@ -715,8 +958,17 @@ class MIDIMonitor(QMainWindow):
         super().showEvent(event)
         # Ensure window title is set
         self.setWindowTitle("Ivory")
-        # Position widgets after window is shown
-        QTimer.singleShot(10, self._position_widgets)
+        # Position widgets after window is shown (coalesce repeated shows)
+        if not self._layout_pending:
+            self._layout_pending = True
+            QTimer.singleShot(0, self._initial_layout)
+    
+    def _initial_layout(self):
+        """Position widgets and restore a detached chord window after show"""
+        self._layout_pending = False
+        self._position_widgets()
+        if self.chord_window_detached and CHORD_DETECTOR_AVAILABLE and self.chord_detection_enabled:
+            self.create_chord_window()  # No-op if it already exists
     
     def _update_piano_height(self):
         """Update piano widget height and constraints based on window width"""
@@ -732,7 +984,7 @@ class MIDIMonitor(QMainWindow):
             # Update min/max sizes
             min_width = 200
             min_piano_height = int(min_width / self.piano_widget.piano_aspect)
-            min_chord_height = 50 if (CHORD_DETECTOR_AVAILABLE and self.chord_detection_enabled and not self.chord_window_detached) else 0
+            min_chord_height = self.CHORD_BASE_HEIGHT if (CHORD_DETECTOR_AVAILABLE and self.chord_detection_enabled and not self.chord_window_detached) else 0
             min_height = min_chord_height + min_piano_height
             
             max_width = 5000
@@ -757,13 +1009,24 @@ class MIDIMonitor(QMainWindow):
         
         # Only position widgets if we have them initialized
         # Window is non-resizable, so this only happens when size menu changes size
-        if hasattr(self, 'piano_widget') and hasattr(self, 'centralWidget'):
+        if self.piano_widget is not None:
             self._position_widgets()
     
     def _position_widgets(self):
         """Position widgets correctly - called from resizeEvent and initial setup"""
+        # setFixedSize() re-enters through resizeEvent; the outer call finishes the layout
+        if self._positioning:
+            return
+        self._positioning = True
+        try:
+            self._apply_widget_geometry()
+        finally:
+            self._positioning = False
+    
+    def _apply_widget_geometry(self):
+        """Size and place the chord label and piano to fill the window exactly"""
         # Safety check - make sure widgets exist
-        if not hasattr(self, 'piano_widget') or not self.piano_widget:
+        if self.piano_widget is None:
             return
         
         # Don't position if window isn't visible yet
@@ -789,15 +1052,15 @@ class MIDIMonitor(QMainWindow):
         required_piano_height = int(new_width / self.piano_widget.piano_aspect)
         
         # Position widgets using layout - but override heights to fill space EXACTLY
-        chord_detached = hasattr(self, 'chord_window_detached') and self.chord_window_detached
-        chord_available = CHORD_DETECTOR_AVAILABLE and hasattr(self, 'chord_detection_enabled') and self.chord_detection_enabled
-        chord_label_exists = hasattr(self, 'chord_label') and self.chord_label
+        chord_detached = self.chord_window_detached
+        chord_available = CHORD_DETECTOR_AVAILABLE and self.chord_detection_enabled
+        chord_label_exists = self.chord_label is not None
         
         if chord_available and not chord_detached and chord_label_exists:
             # Chord label is attached - maintain aspect ratio for piano
             # Calculate chord height based on scale (proportional to window size)
             scale = new_width / self._base_width
-            target_chord_height = int(50 * scale)  # Base 50px scaled
+            target_chord_height = int(self.CHORD_BASE_HEIGHT * scale)  # Base height scaled
             
             # Ensure window height matches exactly: chord_height + piano_height
             required_total_height = target_chord_height + required_piano_height
@@ -851,16 +1114,25 @@ class MIDIMonitor(QMainWindow):
         
         # Update detached chord window width if needed (debounced)
         if self.chord_window_detached and self.chord_window:
-            if not hasattr(self, '_chord_width_update_timer'):
-                self._chord_width_update_timer = QTimer()
-                self._chord_width_update_timer.setSingleShot(True)
-                self._chord_width_update_timer.timeout.connect(self._safe_update_chord_window_width)
-            self._chord_width_update_timer.stop()
-            self._chord_width_update_timer.start(100)
+            self._chord_width_update_timer.start(100)  # start() restarts a running timer
+    
+    def _request_relayout(self, width: int, height: int):
+        """Schedule one resize + widget positioning pass; repeated requests coalesce"""
+        self._pending_layout = (width, height)
+        self._layout_timer.start()
+    
+    def _flush_layout(self):
+        """Apply the latest requested window size and position widgets once"""
+        if self._pending_layout is None:
+            return
+        width, height = self._pending_layout
+        self._pending_layout = None
+        self.setFixedSize(width, height)
+        self._position_widgets()
     
     def update_piano_colors(self):
         """Update piano widget colors"""
-        bg_color = QColor(26, 26, 26) if self.dark_mode else QColor(232, 232, 232)
+        bg_color = self._PIANO_BG_DARK if self.dark_mode else self._PIANO_BG_LIGHT
         self.piano_widget.set_colors(
             dark_mode=self.dark_mode,
             white_idle=self.white_key_idle_color,
@@ -887,80 +1159,84 @@ class MIDIMonitor(QMainWindow):
         port = self.port_name
         if not port:
             # Auto-select: prefer USB-MIDI, then Scarlett, then first available
-            for p in input_ports:
-                if "USB-MIDI" in p:
-                    port = p
-                    break
-            if not port:
-                for p in input_ports:
-                    if "Scarlett" in p or ("USB" in p and "MIDI" in p):
-                        port = p
-                        break
-            if not port:
-                port = input_ports[0]
+            # Single pass; ties keep the port enumeration order
+            best = min(((prio, i) for i, p in enumerate(input_ports)
+                        for rx, prio in _PORT_PRIORITY if rx.search(p)),
+                       default=(99, 0))
+            port = input_ports[best[1]]
         
         try:
-            self.inport = mido.open_input(port)
+            # The backend delivers messages to the callback on its own thread
+            self.inport = mido.open_input(port, callback=self._on_midi_message)
             self.actual_port_name = port
         except Exception as e:
             QMessageBox.critical(self, "MIDI Error", 
                                 f"Error opening MIDI port:\n{e}")
             sys.exit(1)
-        
-        # Start MIDI input thread
-        self.midi_thread_running = True
-        self.midi_thread = threading.Thread(target=self.midi_input_thread, daemon=True)
-        self.midi_thread.start()
     
-    def midi_input_thread(self):
-        """Thread to continuously read MIDI messages"""
-        try:
-            for msg in self.inport:
-                if not self.midi_thread_running:
-                    break
-                
-                current_time = time.time()
-                
-                # Handle note messages
-                if msg.type == 'note_on' and msg.velocity > 0:
-                    self.active_notes[msg.note] = {
-                        'velocity': msg.velocity,
-                        'time': current_time
-                    }
-                    self.notes_to_release.discard(msg.note)
-                elif msg.type == 'note_off' or (msg.type == 'note_on' and msg.velocity == 0):
-                    if self.sustain_pedal_active:
-                        if msg.note in self.active_notes:
-                            self.notes_to_release.add(msg.note)
-                    else:
-                        if msg.note in self.active_notes:
-                            del self.active_notes[msg.note]
-                        self.notes_to_release.discard(msg.note)
-                # Handle sustain pedal (CC 64)
-                elif msg.type == 'control_change' and msg.control == 64:
-                    was_active = self.sustain_pedal_active
-                    self.sustain_pedal_active = (msg.value >= 64)
-                    
-                    if was_active and not self.sustain_pedal_active:
-                        for note in list(self.notes_to_release):
-                            if note in self.active_notes:
-                                del self.active_notes[note]
-                        self.notes_to_release.clear()
-        except Exception:
-            pass  # Thread will exit when port closes
+    def _on_midi_message(self, msg):
+        """MIDI backend callback - only queues the message for the GUI thread"""
+        # Only notes and the sustain pedal affect the display; dropping clock,
+        # active sensing and aftertouch here keeps the queue short
+        msg_type = msg.type
+        if msg_type == 'note_on' or msg_type == 'note_off' or (
+                msg_type == 'control_change' and msg.control == 64):
+            self._midi_queue.append(msg)
+    
+    def _handle_midi_message(self, msg):
+        """Apply one MIDI message to the note and sustain pedal state"""
+        # Handle note messages
+        if msg.type == 'note_on' and msg.velocity > 0:
+            self._active_mask |= 1 << msg.note
+            self._release_mask &= ~(1 << msg.note)
+        elif msg.type == 'note_off' or (msg.type == 'note_on' and msg.velocity == 0):
+            bit = 1 << msg.note
+            if self.sustain_pedal_active:
+                if self._active_mask & bit:
+                    self._release_mask |= bit
+            else:
+                self._active_mask &= ~bit
+                self._release_mask &= ~bit
+        # Handle sustain pedal (CC 64)
+        elif msg.type == 'control_change' and msg.control == 64:
+            was_active = self.sustain_pedal_active
+            self.sustain_pedal_active = (msg.value >= 64)
+            
+            if was_active and not self.sustain_pedal_active:
+                # Release every pedal-held note at once
+                self._active_mask &= ~self._release_mask
+                self._release_mask = 0
     
     def update_gui(self):
-        """Update GUI elements"""
+        """Apply queued MIDI messages and update GUI elements"""
+        mask_before = self._active_mask
+        queue = self._midi_queue
+        while queue:
+            self._handle_midi_message(queue.popleft())
+        if self._active_mask != mask_before:
+            self.notes_changed.emit()
+        
         # Update piano widget
-        self.piano_widget.set_active_notes(self.active_notes)
+        self.piano_widget.set_active_mask(self._active_mask)
         self.piano_widget.set_sustain_pedal(self.sustain_pedal_active)
     
+    def _request_chord_update(self):
+        """Run chord detection if the sounding notes changed since the last run"""
+        if not self.chord_detection_enabled or not self.chord_detector:
+            return
+        if self._active_mask == self._last_chord_mask:
+            return
+        self.update_chord_detection()
+    
     def update_chord_detection(self):
         """Update chord detection"""
         if not self.chord_detection_enabled or not self.chord_detector:
             return
         
-        if not self.active_notes:
+        mask = self._active_mask
+        self._last_chord_mask = mask
+        
+        if not mask:
             self.current_chord = None
             if CHORD_DETECTOR_AVAILABLE:
                 self.chord_label.set_chord(None)
@@ -968,11 +1244,12 @@ class MIDIMonitor(QMainWindow):
                 self.chord_window.chord_label.set_chord(None)
             return
         
-        # Get active note numbers
-        active_note_numbers = set(self.active_notes.keys())
-        
-        # Detect chord
-        chord = self.chord_detector.detect_chord(active_note_numbers)
+        # Detect chord (the detector caches results by voicing and spelling)
+        try:
+            chord = self.chord_detector.detect_chord_mask(mask)
+        except Exception:
+            self._on_chord_detection_error([n for n in range(mask.bit_length()) if mask >> n & 1])
+            chord = None  # Don't leave the previous notes' chord on screen
         self.current_chord = chord
         
         # Update displays
@@ -981,6 +1258,14 @@ class MIDIMonitor(QMainWindow):
         if self.chord_window:
             self.chord_window.chord_label.set_chord(chord)
     
+    def _on_chord_detection_error(self, notes):
+        """Log a detector failure, at most once per CHORD_ERROR_LOG_INTERVAL"""
+        now = time.monotonic()
+        if (self._chord_error_logged_at is None or
+                now - self._chord_error_logged_at >= self.CHORD_ERROR_LOG_INTERVAL):
+            self._chord_error_logged_at = now
+            _log.exception("Chord detection failed for notes %s", notes)
+    
     def contextMenuEvent(self, event):
         """Handle context menu"""
         self.show_context_menu(event.globalPos())
@@ -989,43 +1274,8 @@ class MIDIMonitor(QMainWindow):
         """Show context menu at specified global position"""
         menu = QMenu(self)
         
-        # Apply theme based on dark mode: ivory on black (dark mode) or black on ivory (light mode)
-        if self.dark_mode:
-            # Dark mode: ivory text on black background
-            bg_color = "#000000"
-            text_color = "#E8DCC0"
-            separator_color = "#E8DCC0"
-            selected_bg = "#1a1a1a"
-        else:
-            # Light mode: black text on ivory background
-            bg_color = "#E8DCC0"
-            text_color = "#000000"
-            separator_color = "#000000"
-            selected_bg = "#d4c8b0"
-        
-        menu.setStyleSheet(f"""
-            QMenu {{
-                background-color: {bg_color};
-                color: {text_color};
-                border: 1px solid {bg_color};
-                font-family: "Courier New", Courier, monospace;
-                font-weight: bold;
-            }}
-            QMenu::item {{
-                background-color: transparent;
-                padding: 4px 20px 4px 20px;
-                font-family: "Courier New", Courier, monospace;
-                font-weight: bold;
-            }}
-            QMenu::item:selected {{
-                background-color: {selected_bg};
-            }}
-            QMenu::separator {{
-                height: 1px;
-                background-color: {separator_color};
-                margin: 1px 0px 1px 0px;
-            }}
-        """)
+        # Apply theme based on dark mode (stylesheets are prebuilt class constants)
+        menu.setStyleSheet(self._MENU_CSS_DARK if self.dark_mode else self._MENU_CSS_LIGHT)
         
         # Size menu - always available at top
         size_menu = menu.addMenu("Size")
@@ -1113,8 +1363,7 @@ class MIDIMonitor(QMainWindow):
             layout.addWidget(current_label)
         
         list_widget = QListWidget()
-        for port in input_ports:
-            list_widget.addItem(port)
+        list_widget.addItems(input_ports)
         layout.addWidget(list_widget)
         
         buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
@@ -1129,15 +1378,11 @@ class MIDIMonitor(QMainWindow):
                 try:
                     # Close old port
                     if self.inport:
-                        self.midi_thread_running = False
                         self.inport.close()
                     
                     # Open new port
-                    self.inport = mido.open_input(port)
+                    self.inport = mido.open_input(port, callback=self._on_midi_message)
                     self.actual_port_name = port
-                    self.midi_thread_running = True
-                    self.midi_thread = threading.Thread(target=self.midi_input_thread, daemon=True)
-                    self.midi_thread.start()
                 except Exception as e:
                     QMessageBox.critical(self, "MIDI Error", 
                                         f"Error opening MIDI port:\n{e}")
@@ -1146,6 +1391,8 @@ class MIDIMonitor(QMainWindow):
         """Open color picker for white keys"""
         color = QColorDialog.getColor(self.white_key_idle_color, self, "Choose White Key Color")
         if color.isValid():
+            if color.rgba() == self.white_key_idle_color.rgba():
+                return  # Same color picked - nothing to repaint or save
             self.white_key_idle_color = color
             self.update_piano_colors()
             self.save_settings()
@@ -1154,6 +1401,8 @@ class MIDIMonitor(QMainWindow):
         """Open color picker for black keys"""
         color = QColorDialog.getColor(self.black_key_idle_color, self, "Choose Black Key Color")
         if color.isValid():
+            if color.rgba() == self.black_key_idle_color.rgba():
+                return  # Same color picked - nothing to repaint or save
             self.black_key_idle_color = color
             self.update_piano_colors()
             self.save_settings()
@@ -1162,6 +1411,8 @@ class MIDIMonitor(QMainWindow):
         """Open color picker for active keys"""
         color = QColorDialog.getColor(self.white_key_active_color, self, "Choose Active Key Color")
         if color.isValid():
+            if color.rgba() == self.white_key_active_color.rgba() == self.black_key_active_color.rgba():
+                return  # Same color picked - nothing to repaint or save
             self.white_key_active_color = color
             self.black_key_active_color = color
             self.update_piano_colors()
@@ -1171,6 +1422,8 @@ class MIDIMonitor(QMainWindow):
         """Open color picker for sustain pedal color"""
         color = QColorDialog.getColor(self.sustain_color, self, "Choose Sustain Pedal Color")
         if color.isValid():
+            if color.rgba() == self.sustain_color.rgba():
+                return  # Same color picked - nothing to repaint or save
             self.sustain_color = color
             self.update_piano_colors()
             self.save_settings()
@@ -1193,25 +1446,17 @@ class MIDIMonitor(QMainWindow):
             self.chord_label.setVisible(self.chord_detection_enabled and not self.chord_window_detached)
             if not self.chord_detection_enabled:
                 self.chord_label.set_chord(None)
+            else:
+                # Notes may have changed while detection was off
+                self.update_chord_detection()
         
         # Resize window to maintain aspect ratio
+        sizes = self._compute_layout_sizes()
         if not self.chord_window_detached:
-            current_width = self.width()
-            required_piano_height = int(current_width / self.piano_widget.piano_aspect)
-            chord_height = int(50 * (current_width / self._base_width)) if (self.chord_detection_enabled and CHORD_DETECTOR_AVAILABLE) else 0
-            required_total_height = chord_height + required_piano_height
-            
-            # Update window size immediately
-            self.setFixedSize(current_width, required_total_height)
-            # Use QTimer to ensure window has resized before positioning
-            QTimer.singleShot(10, lambda: self._position_widgets())
+            self._request_relayout(sizes.width, sizes.total_height)
         else:
             # Just update constraints if detached - ensure no white space
-            current_width = self.width()
-            required_piano_height = int(current_width / self.piano_widget.piano_aspect)
-            self.setFixedSize(current_width, required_piano_height)
-            # Use QTimer to ensure window has resized before positioning
-            QTimer.singleShot(10, lambda: self._position_widgets())
+            self._request_relayout(sizes.width, sizes.piano_height)
     
     def toggle_flats_sharps(self):
         """Toggle between flats and sharps"""
@@ -1236,30 +1481,12 @@ class MIDIMonitor(QMainWindow):
             self.chord_window_detached = False
             self.save_settings()  # Save state change
             
+            sizes = self._compute_layout_sizes()
             if CHORD_DETECTOR_AVAILABLE:
-                # Calculate chord height based on current piano size (proportional)
-                current_width = self.width()
-                scale = current_width / self._base_width
-                chord_height = int(50 * scale)  # Base 50px scaled to current size
-                
-                # Set chord label size based on piano, not detached window size
-                self.chord_label.setFixedSize(current_width, chord_height)
-                self.chord_label.setGeometry(0, 0, current_width, chord_height)
-                self.chord_label.setMinimumHeight(int(50 * scale))
-                self.chord_label.setMaximumHeight(int(500 * scale))
-                self.chord_label.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
-                self.chord_label.setVisible(self.chord_detection_enabled)
+                self._restore_attached_chord_label(sizes)
             
             # Resize window to fit piano + chord label (maintain aspect ratio)
-            current_width = self.width()
-            required_piano_height = int(current_width / self.piano_widget.piano_aspect)
-            chord_height = int(50 * (current_width / self._base_width)) if (CHORD_DETECTOR_AVAILABLE and self.chord_detection_enabled) else 0
-            required_total_height = chord_height + required_piano_height
-            
-            # Update fixed size immediately
-            self.setFixedSize(current_width, required_total_height)
-            # Position widgets immediately to prevent white space
-            self._position_widgets()
+            self._request_relayout(sizes.width, sizes.total_height)
         else:
             # Currently attached - DETACH it
             # Save current chord label height before hiding
@@ -1278,14 +1505,35 @@ class MIDIMonitor(QMainWindow):
             
             # CRITICAL: Resize window to fit CURRENT piano height maintaining aspect ratio
             # This ensures the window maintains aspect ratio when detached
-            current_width = self.width()
-            current_piano_height = int(current_width / self.piano_widget.piano_aspect)  # Calculate from width
-            
-            # Resize window to fit piano with aspect ratio maintained
-            # Update fixed size immediately
-            self.setFixedSize(current_width, current_piano_height)
-            # Position widgets immediately to ensure no white space
-            self._position_widgets()
+            sizes = self._compute_layout_sizes()
+            self._request_relayout(sizes.width, sizes.piano_height)
+    
+    def _compute_layout_sizes(self, width: Optional[int] = None) -> _LayoutSizes:
+        """Piano and attached chord label heights for a window width (default: current)"""
+        w = width if width is not None else self.width()
+        scale = w / self._base_width
+        piano_height = int(w / self.piano_widget.piano_aspect)
+        chord_height = int(self.CHORD_BASE_HEIGHT * scale) if (CHORD_DETECTOR_AVAILABLE and self.chord_detection_enabled) else 0
+        return _LayoutSizes(w, scale, piano_height, chord_height, piano_height + chord_height)
+    
+    def _restore_attached_chord_label(self, sizes: _LayoutSizes):
+        """Size and show the main-window chord label after the detached window goes away"""
+        # Freeze painting (children included) so the mutations below cost one repaint
+        self.setUpdatesEnabled(False)
+        try:
+            # Set chord label size based on piano, not detached window size
+            label_height = int(self.CHORD_BASE_HEIGHT * sizes.scale)
+            self.chord_label.setFixedSize(sizes.width, label_height)
+            self.chord_label.setGeometry(0, 0, sizes.width, label_height)
+            self.chord_label.setMinimumHeight(label_height)
+            self.chord_label.setMaximumHeight(int(10 * self.CHORD_BASE_HEIGHT * sizes.scale))
+            self.chord_label.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
+            self.chord_label.setVisible(self.chord_detection_enabled)
+            # Label was not updated while detached - no timer refreshes it now
+            self.chord_label.set_chord(self.current_chord)
+        finally:
+            self.setUpdatesEnabled(True)
+            self.update()
     
     def create_chord_window(self):
         """Create detached chord window"""
@@ -1303,6 +1551,7 @@ class MIDIMonitor(QMainWindow):
         self.chord_window.setWindowTitle("Ivory")
         self.chord_window.setMinimumSize(300, 100)
         self.chord_window.setContentsMargins(0, 0, 0, 0)
+        self.chord_window._drag_position = None  # Set while dragging when borderless
         
         # Apply borderless mode if enabled, otherwise ensure normal window frame is visible
         if self._borderless_mode:
@@ -1325,77 +1574,26 @@ class MIDIMonitor(QMainWindow):
         
         chord_widget = ChordLabelWidget()
         chord_widget.set_chord(self.current_chord)
-        # Non-aspect ratio locked - allow height resizing
-        chord_widget.setMinimumHeight(50)
-        chord_widget.setMaximumHeight(16777215)  # Unlimited height
-        chord_widget.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-        # Disable context menu on widget itself - let window handle it
-        chord_widget.setContextMenuPolicy(Qt.NoContextMenu)
-        # Install event filter for borderless dragging and context menu
-        chord_widget.installEventFilter(self.chord_window)
+        # Configure the widget with its signals blocked; the layout picks it all up once on addWidget
+        with QSignalBlocker(chord_widget):
+            # Non-aspect ratio locked - allow height resizing
+            chord_widget.setMinimumHeight(self.CHORD_BASE_HEIGHT)
+            chord_widget.setMaximumHeight(QWIDGETSIZE_MAX)  # Unlimited height
+            chord_widget.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+            # Disable context menu on widget itself - let window handle it
+            chord_widget.setContextMenuPolicy(Qt.NoContextMenu)
+            # Install event filter for borderless dragging and context menu
+            chord_widget.installEventFilter(self.chord_window)
         layout.addWidget(chord_widget)
         self.chord_window.chord_label = chord_widget
         
-        # Add mouse event handlers for dragging borderless window
-        def chord_mousePressEvent(event):
-            if self._borderless_mode and event.button() == Qt.LeftButton:
-                self.chord_window._drag_position = event.globalPos() - self.chord_window.frameGeometry().topLeft()
-                event.accept()
-            else:
-                QMainWindow.mousePressEvent(self.chord_window, event)
-        
-        def chord_mouseMoveEvent(event):
-            if self._borderless_mode and event.buttons() == Qt.LeftButton and hasattr(self.chord_window, '_drag_position'):
-                self.chord_window.move(event.globalPos() - self.chord_window._drag_position)
-                event.accept()
-            else:
-                QMainWindow.mouseMoveEvent(self.chord_window, event)
-        
-        def chord_mouseReleaseEvent(event):
-            if self._borderless_mode and event.button() == Qt.LeftButton and hasattr(self.chord_window, '_drag_position'):
-                delattr(self.chord_window, '_drag_position')
-            QMainWindow.mouseReleaseEvent(self.chord_window, event)
-        
-        def chord_eventFilter(obj, event):
-            """Event filter for chord window child widgets to enable dragging and context menu"""
-            # Handle context menu events - forward to window
-            if isinstance(event, QMouseEvent) and event.type() == QEvent.MouseButtonPress and event.button() == Qt.RightButton:
-                # Create a QContextMenuEvent and forward to window's contextMenuEvent
-                context_event = QContextMenuEvent(QContextMenuEvent.Mouse, event.pos(), event.globalPos())
-                self.chord_window.contextMenuEvent(context_event)
-                return True  # Consume the event
-            
-            # Handle dragging when borderless mode is enabled
-            if self._borderless_mode and isinstance(event, QMouseEvent):
-                if event.type() == QEvent.MouseButtonPress and event.button() == Qt.LeftButton:
-                    # Set drag position and let event continue
-                    self.chord_window._drag_position = event.globalPos() - self.chord_window.frameGeometry().topLeft()
-                    return False  # Let event continue
-                elif event.type() == QEvent.MouseMove and event.buttons() == Qt.LeftButton and hasattr(self.chord_window, '_drag_position'):
-                    # CRITICAL: Handle mouse move in event filter to enable dragging from child widgets
-                    self.chord_window.move(event.globalPos() - self.chord_window._drag_position)
-                    return True  # Consume event to prevent widget-specific handling
-                elif event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
-                    if hasattr(self.chord_window, '_drag_position'):
-                        delattr(self.chord_window, '_drag_position')
-            return False
-        
-        def chord_contextMenuEvent(event):
-            """Handle context menu for chord window"""
-            # Forward to main window's context menu
-            # Use globalPos() if available, otherwise convert from local position
-            if hasattr(event, 'globalPos'):
-                global_pos = event.globalPos()
-            else:
-                global_pos = self.chord_window.mapToGlobal(event.pos())
-            self.show_context_menu(global_pos)
-        
-        # Override mouse event handlers
-        self.chord_window.mousePressEvent = chord_mousePressEvent
-        self.chord_window.mouseMoveEvent = chord_mouseMoveEvent
-        self.chord_window.mouseReleaseEvent = chord_mouseReleaseEvent
-        self.chord_window.eventFilter = chord_eventFilter
-        self.chord_window.contextMenuEvent = chord_contextMenuEvent
+        # Route the window's event hooks to bound methods (drag when borderless, context menu)
+        win = self.chord_window
+        win.mousePressEvent = partial(self._chord_mousePressEvent, win)
+        win.mouseMoveEvent = partial(self._chord_mouseMoveEvent, win)
+        win.mouseReleaseEvent = partial(self._chord_mouseReleaseEvent, win)
+        win.eventFilter = partial(self._chord_eventFilter, win)
+        win.contextMenuEvent = partial(self._chord_contextMenuEvent, win)
         # Enable context menu using DefaultContextMenu to use contextMenuEvent handler
         self.chord_window.setContextMenuPolicy(Qt.DefaultContextMenu)
         
@@ -1403,7 +1601,7 @@ class MIDIMonitor(QMainWindow):
         # Use piano width but allow height to be resized
         piano_width = self.width()
         default_height = 150
-        if hasattr(self, '_detached_chord_height') and self._detached_chord_height > 0:
+        if self._detached_chord_height > 0:
             default_height = self._detached_chord_height
         
         
@@ -1419,36 +1617,66 @@ class MIDIMonitor(QMainWindow):
             self.chord_window_detached = False
             self.save_settings()  # Save state change
             
+            sizes = self._compute_layout_sizes()
             if CHORD_DETECTOR_AVAILABLE:
-                # Calculate chord height based on current piano size (proportional)
-                current_width = self.width()
-                scale = current_width / self._base_width
-                chord_height = int(50 * scale)  # Base 50px scaled to current size
-                
-                # Set chord label size based on piano, not detached window size
-                self.chord_label.setFixedSize(current_width, chord_height)
-                self.chord_label.setGeometry(0, 0, current_width, chord_height)
-                self.chord_label.setMinimumHeight(int(50 * scale))
-                self.chord_label.setMaximumHeight(int(500 * scale))
-                self.chord_label.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
-                self.chord_label.setVisible(self.chord_detection_enabled)
+                self._restore_attached_chord_label(sizes)
             
             # Resize window to fit piano + chord label
-            current_width = self.width()
-            required_piano_height = int(current_width / self.piano_widget.piano_aspect)
-            chord_height = int(50 * (current_width / self._base_width)) if (CHORD_DETECTOR_AVAILABLE and self.chord_detection_enabled) else 0
-            required_total_height = chord_height + required_piano_height
-            
-            # Update fixed size
-            self.setFixedSize(current_width, required_total_height)
-            self._position_widgets()
+            self._request_relayout(sizes.width, sizes.total_height)
             # Clean up
             self.chord_window = None
             event.accept()
         
         self.chord_window.closeEvent = on_chord_window_close
         self.chord_window.show()
-        
+    
+    def _chord_mousePressEvent(self, win, event):
+        """Start dragging the detached chord window when borderless"""
+        if self._borderless_mode and event.button() == Qt.LeftButton:
+            win._drag_position = event.globalPos() - win.frameGeometry().topLeft()
+            event.accept()
+        else:
+            QMainWindow.mousePressEvent(win, event)
+    
+    def _chord_mouseMoveEvent(self, win, event):
+        """Move the detached chord window while dragging"""
+        if self._borderless_mode and event.buttons() == Qt.LeftButton and win._drag_position is not None:
+            win.move(event.globalPos() - win._drag_position)
+            event.accept()
+        else:
+            QMainWindow.mouseMoveEvent(win, event)
+    
+    def _chord_mouseReleaseEvent(self, win, event):
+        """End dragging the detached chord window"""
+        if self._borderless_mode and event.button() == Qt.LeftButton:
+            win._drag_position = None
+        QMainWindow.mouseReleaseEvent(win, event)
+    
+    def _chord_eventFilter(self, win, obj, event):
+        """Event filter for chord window child widgets to enable dragging and context menu"""
+        event_type = event.type()
+        # Handle context menu events - forward to window
+        if event_type == QEvent.MouseButtonPress and event.button() == Qt.RightButton:
+            # Create a QContextMenuEvent and forward to window's contextMenuEvent
+            context_event = QContextMenuEvent(QContextMenuEvent.Mouse, event.pos(), event.globalPos())
+            win.contextMenuEvent(context_event)
+            return True  # Consume the event
+        
+        # Handle dragging when borderless mode is enabled
+        if not self._borderless_mode:
+            return False
+        handler = self._drag_handlers.get(event_type)
+        return handler(win, event) if handler is not None else False
+    
+    def _chord_contextMenuEvent(self, win, event):
+        """Handle context menu for chord window"""
+        # Forward to main window's context menu
+        # Use globalPos() if available, otherwise convert from local position
+        if hasattr(event, 'globalPos'):
+            global_pos = event.globalPos()
+        else:
+            global_pos = win.mapToGlobal(event.pos())
+        self.show_context_menu(global_pos)
     
     def toggle_borderless_mode(self):
         """Toggle borderless window mode"""
@@ -1458,26 +1686,19 @@ class MIDIMonitor(QMainWindow):
     
     def _apply_borderless_mode(self):
         """Apply borderless mode to window"""
-        if self._borderless_mode:
-            # Remove window frame
-            self.setWindowFlags(Qt.FramelessWindowHint)
-        else:
-            # Restore normal window frame
-            self.setWindowFlags(Qt.Window)
-        
-        # Always ensure title is set
-        self.setWindowTitle("Ivory")
-        # Show window again after flag change
-        self.show()
-        
-        # Apply borderless mode to chord window if it exists
-        if self.chord_window:
-            if self._borderless_mode:
-                self.chord_window.setWindowFlags(Qt.FramelessWindowHint)
-            else:
-                self.chord_window.setWindowFlags(Qt.Window)
-            self.chord_window.setWindowTitle("Ivory")
-            self.chord_window.show()
+        # Changing window flags recreates the native window handle (and hides
+        # the window), so only touch windows whose frame state differs, and flip
+        # just the frameless bit so the other flags survive
+        for window in (self, self.chord_window):
+            if not window:
+                continue
+            if bool(window.windowFlags() & Qt.FramelessWindowHint) != self._borderless_mode:
+                window.setWindowFlag(Qt.FramelessWindowHint, self._borderless_mode)
+                # Always ensure title is set
+                window.setWindowTitle("Ivory")
+                # Show window again if the flag change hid it
+                if window.isHidden():
+                    window.show()
     
     def mousePressEvent(self, event):
         """Handle mouse press for dragging borderless window"""
@@ -1489,7 +1710,7 @@ class MIDIMonitor(QMainWindow):
     
     def mouseMoveEvent(self, event):
         """Handle mouse move for dragging borderless window"""
-        if self._borderless_mode and event.buttons() == Qt.LeftButton and hasattr(self, '_drag_position'):
+        if self._borderless_mode and event.buttons() == Qt.LeftButton and self._drag_position is not None:
             self.move(event.globalPos() - self._drag_position)
             event.accept()
         else:
@@ -1497,27 +1718,37 @@ class MIDIMonitor(QMainWindow):
     
     def mouseReleaseEvent(self, event):
         """Handle mouse release"""
-        if self._borderless_mode and event.button() == Qt.LeftButton and hasattr(self, '_drag_position'):
-            delattr(self, '_drag_position')
+        if self._borderless_mode and event.button() == Qt.LeftButton:
+            self._drag_position = None
         super().mouseReleaseEvent(event)
     
+    def _on_drag_press(self, win, event):
+        """Remember the grab offset; let the event continue to the widget"""
+        if event.button() == Qt.LeftButton:
+            win._drag_position = event.globalPos() - win.frameGeometry().topLeft()
+        return False
+    
+    def _on_drag_move(self, win, event):
+        """Move the window while dragging - CRITICAL: must be handled in the event filter"""
+        if event.buttons() == Qt.LeftButton and win._drag_position is not None:
+            win.move(event.globalPos() - win._drag_position)
+            return True  # Consume the event to prevent widget-specific handling
+        return False
+    
+    def _on_drag_release(self, win, event):
+        """End the drag"""
+        if event.button() == Qt.LeftButton:
+            win._drag_position = None
+        return False
+    
     def eventFilter(self, obj, event):
         """Event filter to enable dragging from child widgets when borderless"""
-        # Only enable dragging when borderless mode is enabled
-        if self._borderless_mode and isinstance(event, QMouseEvent):
-            # Handle left mouse button press for dragging
-            if event.type() == QEvent.MouseButtonPress and event.button() == Qt.LeftButton:
-                # Set drag position and let event continue (widget can still handle it if needed)
-                self._drag_position = event.globalPos() - self.frameGeometry().topLeft()
-                return False  # Let the event continue to the widget
-            # Handle mouse move for dragging - CRITICAL: must handle this in event filter
-            elif event.type() == QEvent.MouseMove and event.buttons() == Qt.LeftButton and hasattr(self, '_drag_position'):
-                self.move(event.globalPos() - self._drag_position)
-                return True  # Consume the event to prevent widget-specific handling
-            # Handle mouse release
-            elif event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
-                if hasattr(self, '_drag_position'):
-                    delattr(self, '_drag_position')
+        # Only enable dragging when borderless mode is enabled; non-mouse events
+        # fall through on a single dict lookup
+        if self._borderless_mode:
+            handler = self._drag_handlers.get(event.type())
+            if handler is not None:
+                return handler(self, event)
         return super().eventFilter(obj, event)
     
     def show_about(self):
@@ -1527,84 +1758,29 @@ class MIDIMonitor(QMainWindow):
         dialog.setMinimumWidth(400)
         dialog.setMinimumHeight(150)
         
-        # Apply theme based on dark mode: ivory on black (dark mode) or black on ivory (light mode)
-        if self.dark_mode:
-            bg_color = "#000000"
-            text_color = "#E8DCC0"
-            button_bg = "#1a1a1a"
-            button_hover = "#2a2a2a"
-            button_border = "#E8DCC0"
-        else:
-            bg_color = "#E8DCC0"
-            text_color = "#000000"
-            button_bg = "#d4c8b0"
-            button_hover = "#c0b49c"
-            button_border = "#000000"
-        
-        dialog.setStyleSheet(f"""
-            QDialog {{
-                background-color: {bg_color};
-                color: {text_color};
-            }}
-            QLabel {{
-                background-color: {bg_color};
-                color: {text_color};
-                font-family: "Courier New", Courier, monospace;
-                font-weight: bold;
-            }}
-            QLabel a {{
-                color: {text_color};
-            }}
-            QDialogButtonBox {{
-                background-color: {bg_color};
-            }}
-            QPushButton {{
-                background-color: {button_bg};
-                color: {text_color};
-                border: 1px solid {button_border};
-                padding: 4px 12px;
-                font-family: "Courier New", Courier, monospace;
-                font-weight: bold;
-            }}
-            QPushButton:hover {{
-                background-color: {button_hover};
-            }}
-        """)
+        # Apply theme based on dark mode (stylesheets are prebuilt class constants)
+        dialog.setStyleSheet(self._ABOUT_QSS_DARK if self.dark_mode else self._ABOUT_QSS_LIGHT)
+        text_color = "#E8DCC0" if self.dark_mode else "#000000"
         
         layout = QVBoxLayout()
         dialog.setLayout(layout)
         
         # Add title
         title_label = QLabel("Ivory")
-        title_font = QFont("Courier New", 16, QFont.Bold)
-        if not title_font.exactMatch():
-            title_font = QFont("Courier", 16, QFont.Bold)
-        if not title_font.exactMatch():
-            title_font = QFont("monospace", 16, QFont.Bold)
-        title_label.setFont(title_font)
+        title_label.setFont(_mono_font(16, True))
         title_label.setAlignment(Qt.AlignCenter)
         layout.addWidget(title_label)
         
         # Add description
         desc_label = QLabel("Simple MIDI Keyboard Monitor with Advanced Chord Detection")
-        desc_font = QFont("Courier New", 10, QFont.Bold)
-        if not desc_font.exactMatch():
-            desc_font = QFont("Courier", 10, QFont.Bold)
-        if not desc_font.exactMatch():
-            desc_font = QFont("monospace", 10, QFont.Bold)
-        desc_label.setFont(desc_font)
+        desc_label.setFont(_mono_font(10, True))
         desc_label.setAlignment(Qt.AlignCenter)
         layout.addWidget(desc_label)
         
         # Add website link
         link_text = f'<a href="https://shambhaline.neocities.org" style="color: {text_color};">shambhaline@neocities.org</a>'
         link_label = QLabel(link_text)
-        link_font = QFont("Courier New", 10, QFont.Bold)
-        if not link_font.exactMatch():
-            link_font = QFont("Courier", 10, QFont.Bold)
-        if not link_font.exactMatch():
-            link_font = QFont("monospace", 10, QFont.Bold)
-        link_label.setFont(link_font)
+        link_label.setFont(_mono_font(10, True))
         link_label.setAlignment(Qt.AlignCenter)
         link_label.setOpenExternalLinks(True)
         layout.addWidget(link_label)
@@ -1618,6 +1794,14 @@ class MIDIMonitor(QMainWindow):
     
     def reset_settings(self):
         """Reset all settings to defaults"""
+        # Remember what was set so side effects run only for values that change
+        old_colors = self._color_key()
+        old_dark_mode = self.dark_mode
+        old_borderless = self._borderless_mode
+        old_detection_enabled = self.chord_detection_enabled
+        old_layout = (self._window_size_percent, old_detection_enabled)
+        old_prefer_flats = self.prefer_flats
+        
         self.dark_mode = False
         self.white_key_idle_color = QColor(232, 220, 192)  # #E8DCC0
         self.black_key_idle_color = QColor(26, 26, 26)  # #1a1a1a
@@ -1631,14 +1815,17 @@ class MIDIMonitor(QMainWindow):
         self.chord_window_detached = False
         self._detached_chord_height = 50
         
-        # Apply borderless mode change (will be False after reset)
-        self._apply_borderless_mode()
+        # Apply borderless mode change (will be False after reset) - recreates the
+        # native window, so only when it was on
+        if old_borderless:
+            self._apply_borderless_mode()
         
-        # Reset window size
-        self.set_window_size_percent(100)
+        # Reset window size (also re-fits the chord label row)
+        if old_layout != (self._window_size_percent, self.chord_detection_enabled):
+            self.set_window_size_percent(100)
         
         # Update chord detector preferences
-        if self.chord_detector:
+        if self.chord_detector and old_prefer_flats != self.prefer_flats:
             self.chord_detector.set_note_preference(self.prefer_flats)
         
         # Close detached window if open
@@ -1650,16 +1837,34 @@ class MIDIMonitor(QMainWindow):
         if CHORD_DETECTOR_AVAILABLE:
             self.chord_label.setVisible(self.chord_detection_enabled)
         
-        self.update_piano_colors()
+        # Nothing polls the chord label, so refresh it for the restored spelling
+        # or re-enabled detection
+        if (old_prefer_flats != self.prefer_flats or
+                old_detection_enabled != self.chord_detection_enabled):
+            self.update_chord_detection()
+        
+        if old_dark_mode != self.dark_mode or old_colors != self._color_key():
+            self.update_piano_colors()
+        # Only schedules a write if some setting actually differs from the last save
         self.save_settings()
     
+    def _color_key(self) -> Tuple[int, ...]:
+        """Key colors as comparable rgba ints"""
+        return (self.white_key_idle_color.rgba(), self.black_key_idle_color.rgba(),
+                self.white_key_active_color.rgba(), self.black_key_active_color.rgba(),
+                self.sustain_color.rgba())
+    
     def closeEvent(self, event):
         """Handle window close"""
-        self.midi_thread_running = False
         if self.inport:
-            self.inport.close()
+            # Detach the port first so nothing else uses it, then close it off the
+            # GUI thread; the app waits for the global pool before exiting
+            inport, self.inport = self.inport, None
+            QThreadPool.globalInstance().start(_MidiCloseRunnable(inport))
         if self.chord_window:
             self.chord_window.close()
+        # Write pending settings now - the flush timer will never fire
+        self._flush_settings()
         event.accept()
 
 
@@ -1671,17 +1876,13 @@ class SingleApplication(QApplication):
         self._appid = appid
         self._shared_memory = QSharedMemory(appid)
         
-        # Try to create shared memory - if it exists, another instance is running
-        if self._shared_memory.attach():
-            # Another instance exists
-            self._is_running = True
+        # Try to create shared memory - if it already exists, another instance is running
+        # (create() doubles as the probe, so no separate attach() round-trip)
+        if self._shared_memory.create(1):
+            # First instance
+            self._is_running = False
         else:
-            # First instance - create shared memory
-            if self._shared_memory.create(1):
-                self._is_running = False
-            else:
-                # Failed to create - assume another instance exists
-                self._is_running = True
+            self._is_running = self._shared_memory.error() == QSharedMemory.AlreadyExists
     
     def is_running(self):
         """Check if another instance is already running"""
@@ -1693,29 +1894,8 @@ class SingleApplication(QApplication):
             self._shared_memory.detach()
 
 
-def main():
-    parser = argparse.ArgumentParser(
-        description="PyQt5 MIDI keyboard monitor with chord detection",
-        formatter_class=argparse.RawDescriptionHelpFormatter
-    )
-    
-    parser.add_argument('-p', '--port', type=str, help='MIDI input port name')
-    parser.add_argument('-l', '--list', action='store_true', help='List available MIDI ports')
-    
-    args = parser.parse_args()
-    
-    # List ports if requested
-    if args.list:
-        mido, _ = check_dependencies()
-        print("Available MIDI Input Ports:")
-        ports = mido.get_input_names()
-        if ports:
-            for i, port in enumerate(ports):
-                print(f"  {i}: {port}")
-        else:
-            print("  No MIDI input ports found!")
-        return
-    
+def main(args):
+    """Run the GUI (--list and --help are handled before the PyQt5 imports)"""
     # Create application with single-instance support
     app = SingleApplication("ivory-midi-monitor", sys.argv)
     app.setApplicationName("Ivory")
@@ -1763,10 +1943,9 @@ def main():
 
 if __name__ == '__main__':
     try:
-        main()
+        main(_args)
     except Exception as e:
         # Show error dialog if possible, otherwise print to stderr
-        import traceback
         error_msg = f"Ivory encountered an error:\n\n{str(e)}\n\n{traceback.format_exc()}"
         try:
             # Try to show error dialog (only if PyQt5 is available)